@@ -3,22 +3,29 @@ import eventlet
 eventlet.monkey_patch()
 
 import os
+import json
+import time
 import uuid
-import asyncio
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_socketio import SocketIO, join_room
 from dotenv import load_dotenv
+
+# Load environment variables from .env before the agents and module-level stores read them
+load_dotenv()
+
 from agents_old import AutomateSubmissionAgent
 from agent_crawler import SiteCrawlerAgent
+from utils.model_router import MODEL_STATS, LLM_REQUESTS
+from utils.crawl_store import CRAWL_STORE, domain_key
+from utils.bulk_jobs import BulkJobStore, BulkCrawlBatch, BulkSubmitBatch
+from utils.crawl_budget import CrawlBudget
+from utils.async_runner import AGENT_LOOP
+from eventlet.semaphore import Semaphore
 from typing import Dict, Any, List
 
 from werkzeug.serving import WSGIRequestHandler
 
-
-# Load environment variables from .env
-load_dotenv()
-
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'Legal.ai*2024'  # Replace with a strong secret key
 CORS(app, resources={
@@ -33,6 +40,27 @@ print("Server started.")
 # Dictionary to keep track of agents by session_id
 agents_dict: Dict[str, AutomateSubmissionAgent] = {}
 
+# Cached crawl results waiting for their session's client to join the room, with the time they were queued
+cached_crawl_results: Dict[str, Any] = {}
+CACHED_RESULT_WAIT_SECONDS = 600
+
+# Browser crawls running at once, shared by single and bulk crawls
+CRAWL_SLOTS = Semaphore(int(os.environ.get('CRAWL_WORKERS', '8')))
+
+# Browser submissions running at once, shared by single and bulk submissions
+SUBMIT_SLOTS = Semaphore(int(os.environ.get('SUBMIT_WORKERS', '4')))
+
+# Sessions waiting this long on user input release their browser and slot; parked sessions expire after the TTL
+SESSION_PARK_AFTER_SECONDS = float(os.environ.get('SESSION_PARK_AFTER_SECONDS', '30'))
+SESSION_PARKED_TTL_SECONDS = float(os.environ.get('SESSION_PARKED_TTL_SECONDS', '1800'))
+
+# Bulk submission batches by batch id
+bulk_submissions: Dict[str, BulkSubmitBatch] = {}
+
+# Bulk crawl batches by batch id, and their persisted progress
+bulk_batches: Dict[str, BulkCrawlBatch] = {}
+BULK_JOB_STORE = BulkJobStore(os.environ.get('BULK_JOB_STORE_PATH', 'data/bulk_jobs.sqlite3'))
+
 class CustomWSGIRequestHandler(WSGIRequestHandler):
     def handle_one_request(self):
         if self.raw_requestline.startswith(b'PRI * HTTP/2.0'):
@@ -48,16 +76,102 @@ def submit():
     formURL = data.get('formURL')
     uniqueIdentifier = data.get('uniqueIdentifier')
     form_requirements = data.get('formRequirements', 'contact forms')
+    resource_profile = data.get('resourceProfile', 'forms')
+    auto_confirm = auto_confirm_policy(data.get('autoConfirm'))
+    if auto_confirm is None:
+        return jsonify({'error': 'autoConfirm must be true, false, "none", "steps" or "all"'}), 400
     session_id = str(uuid.uuid4())
 
     # Instantiate the agent and start the automation in the background
-    agent = AutomateSubmissionAgent(socketio, session_id, input_data, formURL)
+    agent = AutomateSubmissionAgent(socketio, session_id, input_data, formURL, resource_profile=resource_profile,
+                                    auto_confirm=auto_confirm, worker_slots=SUBMIT_SLOTS,
+                                    park_after=SESSION_PARK_AFTER_SECONDS, parked_ttl=SESSION_PARKED_TTL_SECONDS)
     agents_dict[session_id] = agent
-    #eventlet.spawn_n(agent.automate_submission)
-    eventlet.spawn_n(asyncio.run, agent.automate_submission())
+    eventlet.spawn_n(run_submission_agent, agent)
     return jsonify({'session_id': session_id}), 200
 
 
+def auto_confirm_policy(value: Any) -> Any:
+    """Maps the autoConfirm request value to an agent policy ("none", "steps", "all"), or None if invalid."""
+    if value is None or value is False:
+        return 'none'
+    if value is True:
+        return 'all'
+    return value if value in ('none', 'steps', 'all') else None
+
+
+def run_submission_agent(agent: AutomateSubmissionAgent) -> Dict[str, Any]:
+    """
+    Runs a form submission and forgets its session afterwards. The agent holds a shared submission slot
+    only while it has a live browser, so parked sessions do not count against SUBMIT_WORKERS.
+    """
+    try:
+        return AGENT_LOOP.run(agent.automate_submission())
+    finally:
+        agents_dict.pop(agent.session_id, None)
+
+
+@app.route('/api/submit/bulk', methods=['POST'])
+def submit_bulk():
+    """
+    Submits one profile (inputData) to many forms (formURLs) concurrently. Each form gets its own session;
+    status changes, the batched confirmation review and the final summary are emitted to the batch_id room.
+    """
+    data = request.get_json() or {}
+    input_data = data.get('inputData', {})
+    form_urls = data.get('formURLs', [])
+    resource_profile = data.get('resourceProfile', 'forms')
+    if not form_urls:
+        return jsonify({'error': 'formURLs is required'}), 400
+    auto_confirm = auto_confirm_policy(data.get('autoConfirm'))
+    if auto_confirm is None:
+        return jsonify({'error': 'autoConfirm must be true, false, "none", "steps" or "all"'}), 400
+    batch_id = str(uuid.uuid4())
+
+    def emit(event: str, payload: Dict[str, Any]):
+        socketio.emit(event, payload, room=batch_id)
+
+    agents = []
+    batch = None
+    # Live browsers of this batch; forms parked while waiting on review give theirs up.
+    batch_slots = Semaphore(max(1, int(data.get('concurrency', 4))))
+    for form_url in form_urls:
+        agent = AutomateSubmissionAgent(
+            socketio, str(uuid.uuid4()), input_data, form_url, resource_profile=resource_profile,
+            review_hook=lambda agent, responses: batch.request_review(agent, responses),
+            on_status=lambda agent, status: batch.on_status(agent, status),
+            auto_confirm=auto_confirm, worker_slots=SUBMIT_SLOTS, batch_slots=batch_slots,
+            park_after=SESSION_PARK_AFTER_SECONDS, parked_ttl=SESSION_PARKED_TTL_SECONDS
+        )
+        agents_dict[agent.session_id] = agent
+        agents.append(agent)
+
+    def finish():
+        # Keep the finished batch queryable for an hour.
+        eventlet.spawn_after(3600, bulk_submissions.pop, batch_id, None)
+
+    batch = BulkSubmitBatch(
+        batch_id, agents, run_submission_agent, emit,
+        review_window=float(data.get('reviewWindowSeconds', 5)),
+        on_done=finish
+    )
+    bulk_submissions[batch_id] = batch
+    batch.start()
+    return jsonify({
+        'batch_id': batch_id,
+        'sessions': [{'session_id': agent.session_id, 'formURL': agent.form_url} for agent in agents]
+    }), 200
+
+
+@app.route('/api/submit/bulk/<batch_id>', methods=['GET'])
+def bulk_submit_status(batch_id):
+    """Returns the status of every form of a bulk submission."""
+    batch = bulk_submissions.get(batch_id)
+    if batch is None:
+        return jsonify({'error': 'unknown batch'}), 404
+    return jsonify(batch.snapshot())
+
+
 @app.route('/api/crawl', methods=['POST'])
 def start_crawl():
     data = request.json
@@ -66,14 +180,126 @@ def start_crawl():
     if not startUrl:
         return jsonify({'error': 'startUrl is required'}), 400
 
+    resource_profile = data.get('resourceProfile', 'crawler')
+    force_refresh = data.get('refresh', False)
+    # Optional limits: {"maxPages", "deadlineSeconds", "maxTokens", "maxBytes"}; results report which one ran out.
+    try:
+        budget = CrawlBudget.from_request(data.get('budget'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'budget values must be numbers'}), 400
+
     session_id = str(uuid.uuid4())
-    agent = SiteCrawlerAgent(socketio, session_id, startUrl)
+    domain = domain_key(startUrl)
+    cached_result, cache_status = CRAWL_STORE.get(domain)
+    if force_refresh:
+        cached_result, cache_status = None, 'missing'
+
+    if cached_result is not None:
+        # Serve the stored result right away; it is emitted once the client joins the room.
+        now = time.time()
+        for stale_session in [sid for sid, (queued_at, _) in cached_crawl_results.items()
+                              if now - queued_at > CACHED_RESULT_WAIT_SECONDS]:
+            cached_crawl_results.pop(stale_session, None)
+        cached_crawl_results[session_id] = (now, dict(cached_result, cached=True, cache_status=cache_status))
+        if cache_status == 'stale' and CRAWL_STORE.try_start_refresh(domain):
+            agent = SiteCrawlerAgent(socketio, session_id, startUrl, resource_profile=resource_profile,
+                                     crawl_store=CRAWL_STORE, budget=budget)
+            agents_dict[session_id] = agent
+            eventlet.spawn_n(run_refresh, agent, domain)
+        return jsonify({'session_id': session_id, 'cache_status': cache_status, 'results': cached_result})
+
+    agent = SiteCrawlerAgent(socketio, session_id, startUrl, resource_profile=resource_profile,
+                             crawl_store=CRAWL_STORE, budget=budget)
     agents_dict[session_id] = agent
 
     # Properly schedule the coroutine
-    eventlet.spawn_n(asyncio.run, agent.run())
+    eventlet.spawn_n(run_crawl_agent, agent)
+
+    return jsonify({'session_id': session_id, 'cache_status': cache_status, 'budget': budget.report()['limits']})
+
+
+def run_crawl_agent(agent: SiteCrawlerAgent) -> Dict[str, Any]:
+    """Runs a crawl once a shared crawl slot is free."""
+    with CRAWL_SLOTS:
+        return AGENT_LOOP.run(agent.run())
+
+
+def run_refresh(agent: SiteCrawlerAgent, domain: str):
+    """Re-crawls a domain whose stored result is stale."""
+    try:
+        run_crawl_agent(agent)
+    finally:
+        CRAWL_STORE.finish_refresh(domain)
 
-    return jsonify({'session_id': session_id})
+
+@app.route('/api/crawl/bulk', methods=['POST'])
+def start_bulk_crawl():
+    """
+    Crawls many start URLs and streams one NDJSON line per finished URL.
+    Passing the batchId of an earlier batch resumes it: finished results are replayed, the rest are crawled.
+    """
+    data = request.json or {}
+    start_urls = data.get('startUrls', [])
+    batch_id = data.get('batchId') or str(uuid.uuid4())
+    force_refresh = data.get('refresh', False)
+    budget_data = data.get('budget')
+    try:
+        CrawlBudget.from_request(budget_data)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'budget values must be numbers'}), 400
+    if not start_urls and not data.get('batchId'):
+        return jsonify({'error': 'startUrls is required'}), 400
+    if batch_id in bulk_batches and not bulk_batches[batch_id].done:
+        return jsonify({'error': 'batch is already running', 'batch_id': batch_id}), 409
+
+    def crawl_one(url: str) -> Dict[str, Any]:
+        if not force_refresh:
+            cached_result, cache_status = CRAWL_STORE.get(domain_key(url))
+            if cache_status == 'fresh':
+                return dict(cached_result, cache_status=cache_status)
+        agent = SiteCrawlerAgent(socketio, f"{batch_id}:{uuid.uuid4()}", url, crawl_store=CRAWL_STORE,
+                                 stream_video=False, budget=CrawlBudget.from_request(budget_data))
+        return AGENT_LOOP.run(agent.run())
+
+    batch = BulkCrawlBatch(
+        batch_id, crawl_one, BULK_JOB_STORE, CRAWL_SLOTS,
+        concurrency=int(data.get('concurrency', 8)),
+        per_domain_concurrency=int(data.get('perDomainConcurrency', 1)),
+        on_done=lambda: bulk_batches.pop(batch_id, None)
+    )
+    bulk_batches[batch_id] = batch
+    header = batch.start(start_urls)
+
+    def generate():
+        try:
+            yield json.dumps(header) + "\n"
+            for line in batch.lines():
+                yield line
+        except GeneratorExit:
+            # Client went away: stop scheduling; the batch can be resumed with its batchId.
+            batch.cancel()
+            raise
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/crawl/bulk/<batch_id>/cancel', methods=['POST'])
+def cancel_bulk_crawl(batch_id):
+    """Stops scheduling new URLs of a bulk batch; crawls already running finish."""
+    batch = bulk_batches.get(batch_id)
+    if batch is None:
+        return jsonify({'error': 'unknown or finished batch'}), 404
+    batch.cancel()
+    return jsonify({'batch_id': batch_id, 'cancelled': True})
+
+@app.route('/api/llm-stats', methods=['GET'])
+def llm_stats():
+    """Returns per-model latency and success statistics and request coalescing counters."""
+    return jsonify({
+        'models': MODEL_STATS.snapshot(),
+        'coalesced_requests': LLM_REQUESTS.coalesced,
+        'in_flight_requests': LLM_REQUESTS.in_flight()
+    })
 
 @socketio.on('join')
 def on_join(data):
@@ -82,6 +308,9 @@ def on_join(data):
     if session_id:
         join_room(session_id)
         print(f"Client joined room: {session_id}")
+        queued = cached_crawl_results.pop(session_id, None)
+        if queued is not None:
+            socketio.emit('crawl-results', queued[1], room=session_id)
     else:
         print("Error: No session_id provided in join event.")
 
@@ -102,6 +331,16 @@ def handle_user_input_event(data):
         print(f"No agent found for session_id: {session_id}")
 
 
+@socketio.on('bulk-review-response')
+def handle_bulk_review_response(data):
+    """Applies the answers to a batched review: {"batch_id", "decisions": {session_id: "yes" | "no"}}."""
+    batch = bulk_submissions.get(data.get('batch_id'))
+    if batch is None:
+        print(f"No bulk submission found for batch_id: {data.get('batch_id')}")
+        return
+    batch.review(data.get('decisions', {}))
+
+
 if __name__ == '__main__':
     #socketio.run(app, host='0.0.0.0', port=5000)
     #socketio.run(app, host='0.0.0.0', port=5000, ssl_context=('cert.pem', 'key.pem'))
@@ -4,6 +4,11 @@ eventlet.monkey_patch()
 
 from flask import Flask, request, jsonify
 from flask_socketio import SocketIO, join_room, leave_room
+from dotenv import load_dotenv
+
+# Load environment variables from .env (GEMINI_API_KEY, store paths) before the agents read them
+load_dotenv()
+
 from agent_crawler import SiteCrawlerAgent
 from agents_old import AutomateSubmissionAgent
 import uuid
@@ -0,0 +1,47 @@
+# utils/async_runner.py
+import asyncio
+import threading
+from typing import Any, Coroutine
+
+import eventlet
+
+
+class AsyncRunner:
+    """
+    Runs the coroutines of all agents on one asyncio loop hosted in a green thread.
+    Green threads share their OS thread's running-loop slot, so a second asyncio.run() started while
+    another agent's loop is waiting fails with "cannot be called from a running event loop";
+    submitting to a single shared loop lets any number of agents run concurrently.
+    Blocking calls inside agents (LLM requests) must go through asyncio.to_thread to keep the loop free.
+    """
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                eventlet.spawn_n(self._run_forever, self.loop)
+        return self.loop
+
+    @staticmethod
+    def _run_forever(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def run(self, coro: Coroutine) -> Any:
+        """Runs a coroutine on the shared loop and blocks the calling green thread until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+
+AGENT_LOOP = AsyncRunner()
+
+
+def resolve_future(future: asyncio.Future, value: Any):
+    """Sets the result of a future from outside its loop (e.g. a Socket.IO handler), waking the loop."""
+    def _set():
+        if not future.done():
+            future.set_result(value)
+    future.get_loop().call_soon_threadsafe(_set)
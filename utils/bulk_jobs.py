@@ -0,0 +1,259 @@
+# utils/bulk_jobs.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Iterator, Tuple
+
+import eventlet
+from eventlet.queue import Queue
+from eventlet.semaphore import Semaphore
+
+from utils.crawl_store import domain_key
+
+
+class BulkJobStore:
+    """Persists the URLs of each bulk batch and the result of every finished URL, so batches can be resumed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS batch_items ("
+                " batch_id TEXT NOT NULL, position INTEGER NOT NULL, url TEXT NOT NULL,"
+                " status TEXT NOT NULL, result TEXT, finished_at REAL,"
+                " PRIMARY KEY (batch_id, position))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_batch(self, batch_id: str, urls: List[str]):
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO batch_items (batch_id, position, url, status) VALUES (?, ?, ?, 'pending')",
+                [(batch_id, position, url) for position, url in enumerate(urls)]
+            )
+
+    def items(self, batch_id: str) -> List[Tuple[int, str, str, Any]]:
+        """Returns (position, url, status, result) for every URL of the batch."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT position, url, status, result FROM batch_items WHERE batch_id = ? ORDER BY position",
+                (batch_id,)
+            ).fetchall()
+        return [(position, url, status, json.loads(result) if result else None) for position, url, status, result in rows]
+
+    def mark(self, batch_id: str, position: int, status: str, result: Dict[str, Any] = None):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE batch_items SET status = ?, result = ?, finished_at = ? WHERE batch_id = ? AND position = ?",
+                (status, json.dumps(result) if result is not None else None, time.time(), batch_id, position)
+            )
+
+
+class BulkCrawlBatch:
+    """
+    Runs crawl_fn over a batch of start URLs with a batch-wide concurrency limit, a per-domain limit
+    and a process-wide slot semaphore shared with single crawls. Each finished URL is persisted and
+    pushed to `results` as one NDJSON line; cancel() stops scheduling and lets running crawls finish.
+    """
+
+    def __init__(self, batch_id: str, crawl_fn: Callable[[str], Dict[str, Any]], store: BulkJobStore,
+                 worker_slots: Semaphore, concurrency: int = 8, per_domain_concurrency: int = 1,
+                 on_done: Callable[[], None] = None):
+        self.batch_id = batch_id
+        self.crawl_fn = crawl_fn
+        self.store = store
+        self.worker_slots = worker_slots
+        self.concurrency = max(1, concurrency)
+        self.per_domain_concurrency = max(1, per_domain_concurrency)
+        self.results: Queue = Queue()
+        self.cancelled = False
+        self.done = False
+        self.not_started = 0
+        self._domain_slots: Dict[str, Semaphore] = {}
+        self.on_done = on_done
+
+    def start(self, urls: List[str]) -> Dict[str, Any]:
+        """
+        Registers the URLs (no-op for already known ones) and schedules those not finished yet.
+        On resume, finished results are replayed first and failed URLs are retried.
+        """
+        self.store.create_batch(self.batch_id, urls)
+        items = self.store.items(self.batch_id)
+        finished = [item for item in items if item[2] in ("ok", "cached")]
+        pending = [item for item in items if item[2] not in ("ok", "cached")]
+        for position, url, status, result in finished:
+            self.results.put(self._line(position, url, status, result, resumed=True))
+        eventlet.spawn_n(self._dispatch, pending)
+        return {"type": "batch", "batch_id": self.batch_id, "total": len(items),
+                "completed": len(finished), "remaining": len(pending)}
+
+    def cancel(self):
+        self.cancelled = True
+
+    def lines(self) -> Iterator[str]:
+        """Yields NDJSON lines as URLs finish, ending with a summary line."""
+        while True:
+            line = self.results.get()
+            if line is None:
+                break
+            yield line
+
+    def _dispatch(self, pending: List[Tuple[int, str, str, Any]]):
+        pool = eventlet.GreenPool(self.concurrency)
+        for position, url, _, _ in pending:
+            if self.cancelled:
+                self.not_started += 1
+                continue
+            pool.spawn_n(self._run_one, position, url)
+        pool.waitall()
+        self.done = True
+        if self.on_done:
+            self.on_done()
+        self.results.put(json.dumps({
+            "type": "summary", "batch_id": self.batch_id, "cancelled": self.cancelled, "not_started": self.not_started
+        }) + "\n")
+        self.results.put(None)
+
+    def _run_one(self, position: int, url: str):
+        domain = domain_key(url)
+        domain_slot = self._domain_slots.setdefault(domain, Semaphore(self.per_domain_concurrency))
+        with domain_slot:
+            if self.cancelled:
+                self.not_started += 1
+                return
+            with self.worker_slots:
+                try:
+                    result = self.crawl_fn(url)
+                    status = "cached" if result.get("cache_status") == "fresh" else ("error" if "error" in result else "ok")
+                except Exception as e:
+                    result, status = {"error": str(e)}, "error"
+        self.store.mark(self.batch_id, position, status, result)
+        self.results.put(self._line(position, url, status, result))
+
+    def _line(self, position: int, url: str, status: str, result: Any, resumed: bool = False) -> str:
+        return json.dumps({
+            "type": "result", "batch_id": self.batch_id, "index": position, "url": url,
+            "status": status, "resumed": resumed, "result": result
+        }) + "\n"
+
+
+FINAL_SUBMIT_STATUSES = {"submitted", "unconfirmed", "cancelled", "failed", "expired"}
+
+
+class BulkSubmitBatch:
+    """
+    Submits one profile to many forms: one agent per form, all started at once. The agents take a slot of
+    the batch (its concurrency) and a process-wide submission slot themselves, and give both up while
+    parked, so forms waiting on review do not hold back the rest of the batch. Status changes are emitted
+    as `bulk-submit-status`. Page confirmations are not asked per form; they are collected and emitted
+    together as one `bulk-review`, either when every unfinished form is waiting for review or
+    `review_window` seconds after the first one asked.
+    """
+
+    def __init__(self, batch_id: str, agents: List[Any], run_fn: Callable[[Any], Dict[str, Any]],
+                 emit: Callable[[str, Dict[str, Any]], None],
+                 review_window: float = 5.0, on_done: Callable[[], None] = None):
+        self.batch_id = batch_id
+        self.agents = {agent.session_id: agent for agent in agents}
+        self.run_fn = run_fn
+        self.emit = emit
+        self.review_window = review_window
+        self.on_done = on_done
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.pending_reviews: Dict[str, Dict[str, Any]] = {}
+        self._review_timer = None
+        self.done = False
+
+    def start(self):
+        eventlet.spawn_n(self._dispatch)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "batch_id": self.batch_id,
+            "done": self.done,
+            "forms": [
+                {"session_id": session_id, "form_url": agent.form_url, "status": agent.status,
+                 "result": self.results.get(session_id)}
+                for session_id, agent in self.agents.items()
+            ],
+        }
+
+    def on_status(self, agent: Any, status: str):
+        self.emit("bulk-submit-status", {
+            "batch_id": self.batch_id, "session_id": agent.session_id, "form_url": agent.form_url, "status": status
+        })
+
+    def request_review(self, agent: Any, responses: Dict[str, Any]):
+        """Review hook of the agents: queues a page confirmation for the next batched review."""
+        self.pending_reviews[agent.session_id] = {
+            "session_id": agent.session_id, "form_url": agent.form_url, "responses": responses
+        }
+        if self._all_waiting():
+            self.flush_reviews()
+        elif self._review_timer is None:
+            self._review_timer = eventlet.spawn_after(self.review_window, self.flush_reviews)
+
+    def flush_reviews(self):
+        """Emits all queued confirmations as one review; they stay pending until answered."""
+        if self._review_timer is not None:
+            self._review_timer.cancel()
+            self._review_timer = None
+        if self.pending_reviews:
+            self.emit("bulk-review", {
+                "batch_id": self.batch_id,
+                "message": "Shall I submit these forms with the following details?",
+                "forms": list(self.pending_reviews.values()),
+            })
+
+    def review(self, decisions: Dict[str, str]) -> List[str]:
+        """Applies {session_id: "yes" | "no"} decisions to waiting forms. Returns the session ids answered."""
+        answered = []
+        for session_id, decision in decisions.items():
+            agent = self.agents.get(session_id)
+            if agent is None or self.pending_reviews.pop(session_id, None) is None:
+                continue
+            agent.handle_user_input({"value": decision})
+            answered.append(session_id)
+        return answered
+
+    def _dispatch(self):
+        pool = eventlet.GreenPool(max(1, len(self.agents)))
+        for agent in self.agents.values():
+            pool.spawn_n(self._run_one, agent)
+        pool.waitall()
+        self.done = True
+        if self.on_done:
+            self.on_done()
+        self.emit("bulk-submit-done", self.snapshot())
+
+    def _run_one(self, agent: Any):
+        try:
+            result = self.run_fn(agent)
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+        self.results[agent.session_id] = result
+        # An expired form leaves its confirmation unanswered.
+        self.pending_reviews.pop(agent.session_id, None)
+        # A form that finished may be the last one the pending reviews were waiting for.
+        if self.pending_reviews and self._all_waiting():
+            self.flush_reviews()
+
+    def _all_waiting(self) -> bool:
+        """True when every form that has not finished has a confirmation queued."""
+        unfinished = [agent for agent in self.agents.values() if agent.status not in FINAL_SUBMIT_STATUSES]
+        return all(agent.session_id in self.pending_reviews for agent in unfinished)
@@ -0,0 +1,153 @@
+# utils/confirmation.py
+import asyncio
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Frame, Response
+
+SUCCESS_TEXTS = [
+    "thank you", "thanks for", "successfully submitted", "we have received your", "we've received your",
+    "your form has been submitted", "submission received", "application received", "we will be in touch",
+    "we'll be in touch", "message has been sent", "message sent",
+]
+
+# Tags the form that is about to be submitted (or the submit button's container when there is no <form>),
+# and returns its action endpoint and the success texts already on the page, which are ignored later.
+ARM_SCRIPT = """({submitSelector, texts}) => {
+    let button = null;
+    try { button = submitSelector ? document.querySelector(submitSelector) : null; } catch (e) {}
+    const form = (button && button.closest('form')) || document.querySelector('form');
+    const target = form || (button && button.parentElement);
+    document.querySelectorAll('[data-confirmation-watch]').forEach(el => el.removeAttribute('data-confirmation-watch'));
+    if (target) target.setAttribute('data-confirmation-watch', '1');
+    const body = (document.body ? document.body.innerText : '').toLowerCase();
+    return {
+        action: form && form.getAttribute('action') ? form.action : null,
+        method: form ? (form.getAttribute('method') || 'get').toLowerCase() : null,
+        watched: !!target,
+        presentTexts: texts.filter(text => body.includes(text)),
+    };
+}"""
+
+# Resolves with the first DOM signal: a new success text or removal/hiding of the watched form.
+# Resolves null at the deadline.
+DOM_WATCH_SCRIPT = """({texts, watched, timeoutMs}) => new Promise(resolve => {
+    const check = () => {
+        const body = (document.body ? document.body.innerText : '').toLowerCase();
+        const text = texts.find(candidate => body.includes(candidate));
+        if (text) return {signal: 'success_message', detail: text};
+        if (watched) {
+            const form = document.querySelector('[data-confirmation-watch]');
+            if (!form) return {signal: 'form_absence', detail: 'form removed'};
+            const rect = form.getBoundingClientRect();
+            if (rect.width === 0 && rect.height === 0) return {signal: 'form_absence', detail: 'form hidden'};
+        }
+        return null;
+    };
+    const initial = check();
+    if (initial) return resolve(initial);
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        const result = check();
+        if (result) { observer.disconnect(); clearTimeout(timer); resolve(result); }
+    });
+    observer.observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+    timer = setTimeout(() => { observer.disconnect(); resolve(null); }, timeoutMs);
+})"""
+
+
+def same_endpoint(url: str, action: str) -> bool:
+    a, b = urlparse(url), urlparse(action)
+    return a.hostname == b.hostname and a.path.rstrip("/") == b.path.rstrip("/")
+
+
+class ConfirmationWatcher:
+    """
+    Races every confirmation signal after a form submit and resolves on the first positive one:
+    main-frame navigation, a new success text or the form disappearing (MutationObserver), or a
+    successful response from the form's action endpoint.
+    arm() must run before the submit click so fast signals are not missed; wait() returns
+    {"confirmed", "signal", "detail", "elapsed_ms", "failures"}.
+    """
+
+    def __init__(self, page: Page, success_texts: List[str] = None):
+        self.page = page
+        self.success_texts = [text.lower() for text in (success_texts or SUCCESS_TEXTS)]
+        self.loop = asyncio.get_event_loop()
+        self.result: asyncio.Future = self.loop.create_future()
+        self.original_url: Optional[str] = None
+        self.action: Optional[str] = None
+        self.watched = False
+        self.texts: List[str] = []
+        # Error responses from the action endpoint; reported, but not treated as a signal.
+        self.failures: List[str] = []
+        self.armed_at = 0.0
+
+    async def arm(self, submit_selector: str = None):
+        self.original_url = self.page.url
+        self.armed_at = self.loop.time()
+        try:
+            state = await self.page.evaluate(ARM_SCRIPT, {"submitSelector": submit_selector, "texts": self.success_texts})
+        except Exception:
+            state = {"action": None, "method": None, "watched": False, "presentTexts": []}
+        self.action = state["action"]
+        self.watched = state["watched"]
+        self.texts = [text for text in self.success_texts if text not in state["presentTexts"]]
+        self.page.on("framenavigated", self._on_navigated)
+        self.page.on("response", self._on_response)
+
+    def close(self):
+        self.page.remove_listener("framenavigated", self._on_navigated)
+        self.page.remove_listener("response", self._on_response)
+
+    def _resolve(self, signal: str, detail: str):
+        if not self.result.done():
+            self.result.set_result({"signal": signal, "detail": detail})
+
+    def _on_navigated(self, frame: Frame):
+        if frame == self.page.main_frame and frame.url != self.original_url:
+            self._resolve("url_change", f"{self.original_url} -> {frame.url}")
+
+    def _on_response(self, response: Response):
+        request = response.request
+        if not self.action or request.method not in ("POST", "PUT") or not same_endpoint(response.url, self.action):
+            return
+        if response.status < 400:
+            self._resolve("network_response", f"{request.method} {response.url} -> {response.status}")
+        else:
+            self.failures.append(f"{request.method} {response.url} -> {response.status}")
+
+    async def _watch_dom(self, timeout_ms: float):
+        """Runs the in-page observer until the deadline, re-installing it after same-URL reloads."""
+        deadline = self.loop.time() + timeout_ms / 1000
+        while not self.result.done():
+            remaining = (deadline - self.loop.time()) * 1000
+            if remaining <= 0:
+                return
+            try:
+                found = await self.page.evaluate(
+                    DOM_WATCH_SCRIPT, {"texts": self.texts, "watched": self.watched, "timeoutMs": remaining}
+                )
+            except Exception:
+                # The document went away (navigation or reload); the navigation handler covers URL changes.
+                await asyncio.sleep(0.1)
+                continue
+            if found:
+                self._resolve(found["signal"], found["detail"])
+            return
+
+    async def wait(self, timeout: float = 15000) -> Dict[str, Any]:
+        """Waits for the first positive signal, at most `timeout` milliseconds after arm()."""
+        remaining = max(0.0, timeout / 1000 - (self.loop.time() - self.armed_at))
+        dom_task = asyncio.create_task(self._watch_dom(remaining * 1000))
+        try:
+            result = await asyncio.wait_for(asyncio.shield(self.result), timeout=remaining)
+        except asyncio.TimeoutError:
+            result = None
+        finally:
+            dom_task.cancel()
+            self.close()
+        elapsed_ms = round((self.loop.time() - self.armed_at) * 1000)
+        if result is None:
+            return {"confirmed": False, "signal": None, "detail": None, "elapsed_ms": elapsed_ms, "failures": self.failures}
+        return dict(result, confirmed=True, elapsed_ms=elapsed_ms, failures=self.failures)
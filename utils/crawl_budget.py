@@ -0,0 +1,96 @@
+# utils/crawl_budget.py
+import time
+from typing import Dict, Any, Optional
+
+# Request keys accepted by CrawlBudget.from_request, mapped to constructor arguments.
+BUDGET_FIELDS = {
+    "maxPages": "max_pages",
+    "deadlineSeconds": "deadline_seconds",
+    "maxTokens": "max_tokens",
+    "maxBytes": "max_bytes",
+}
+
+
+class CrawlBudget:
+    """
+    Limits of one crawl: pages loaded, wall-clock seconds, LLM tokens (prompt + output)
+    and bytes downloaded. A limit of None is unbounded. The crawler checks the budget
+    before each page and each LLM call and stops with partial results once a limit is hit;
+    `exhausted` names the first limit that ran out.
+    """
+
+    def __init__(self, max_pages: int = 10, deadline_seconds: float = 120,
+                 max_tokens: Optional[int] = 200000, max_bytes: Optional[int] = 50 * 1024 * 1024):
+        self.max_pages = max_pages
+        self.deadline_seconds = deadline_seconds
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.started_at = time.monotonic()
+        self.pages = 0
+        self.tokens = 0
+        self.bytes = 0
+        self.exhausted: Optional[str] = None
+
+    @classmethod
+    def from_request(cls, data: Dict[str, Any]) -> "CrawlBudget":
+        """Builds a budget from a request's `budget` object, keeping defaults for missing keys."""
+        kwargs = {}
+        for key, argument in BUDGET_FIELDS.items():
+            if key in (data or {}):
+                value = data[key]
+                kwargs[argument] = None if value is None else (float(value) if argument == "deadline_seconds" else int(value))
+        return cls(**kwargs)
+
+    def start(self):
+        self.started_at = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed())
+
+    def update(self, pages: int = None, tokens: int = None, downloaded: int = None):
+        """Records the current usage totals."""
+        if pages is not None:
+            self.pages = pages
+        if tokens is not None:
+            self.tokens = tokens
+        if downloaded is not None:
+            self.bytes = downloaded
+
+    def check(self) -> Optional[str]:
+        """Returns the name of the exhausted limit ("pages", "deadline", "tokens", "bytes") or None."""
+        if self.exhausted is None:
+            if self.max_pages is not None and self.pages >= self.max_pages:
+                self.exhausted = "pages"
+            elif self.deadline_seconds is not None and self.elapsed() >= self.deadline_seconds:
+                self.exhausted = "deadline"
+            elif self.max_tokens is not None and self.tokens >= self.max_tokens:
+                self.exhausted = "tokens"
+            elif self.max_bytes is not None and self.bytes >= self.max_bytes:
+                self.exhausted = "bytes"
+        return self.exhausted
+
+    def mark_exhausted(self, reason: str):
+        if self.exhausted is None:
+            self.exhausted = reason
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "exhausted": self.exhausted,
+            "limits": {
+                "pages": self.max_pages,
+                "deadline_seconds": self.deadline_seconds,
+                "tokens": self.max_tokens,
+                "bytes": self.max_bytes,
+            },
+            "used": {
+                "pages": self.pages,
+                "seconds": round(self.elapsed(), 2),
+                "tokens": self.tokens,
+                "bytes": self.bytes,
+            },
+        }
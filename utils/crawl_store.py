@@ -0,0 +1,134 @@
+# utils/crawl_store.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+
+def domain_key(url: str) -> str:
+    """Store key for a start URL: lower-case host without a leading 'www.'."""
+    host = (urlparse(url if "://" in url else f"https://{url}").hostname or "").lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+class CrawlStore:
+    """
+    Persistent per-domain store of crawl outputs (SQLite), shared by all sessions.
+    A result is "fresh" for `fresh_ttl` seconds, then "stale" (served while a refresh runs)
+    until `max_age`, after which it is treated as missing. Per-page records are kept alongside:
+    the content fingerprint, HTTP validators (ETag, Last-Modified), the extraction and the LLM output,
+    so recrawls can skip unchanged pages.
+    """
+
+    def __init__(self, path: str, fresh_ttl: float = 6 * 3600, max_age: float = 7 * 24 * 3600):
+        self.path = path
+        self.fresh_ttl = fresh_ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS domains ("
+                " domain TEXT PRIMARY KEY, result TEXT NOT NULL, crawled_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY, domain TEXT NOT NULL, fingerprint TEXT NOT NULL, crawled_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS pages_domain ON pages(domain)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+            for column in ("final_url", "etag", "last_modified", "extraction", "llm_output"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, domain: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Returns (result, status) with status "fresh", "stale" or "missing"."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT result, crawled_at FROM domains WHERE domain = ?", (domain,)).fetchone()
+        if row is None:
+            return None, "missing"
+        age = time.time() - row[1]
+        if age > self.max_age:
+            return None, "missing"
+        result = json.loads(row[0])
+        result["crawled_at"] = row[1]
+        return result, "fresh" if age <= self.fresh_ttl else "stale"
+
+    def put(self, domain: str, result: Dict[str, Any], pages: Dict[str, Dict[str, Any]] = None):
+        """
+        Saves the crawl result of a domain and its page records, keyed by canonical URL.
+        A record has "url", "fingerprint", "etag", "last_modified", "extraction" and "llm_output".
+        With result None only the page records are saved.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            if result is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO domains (domain, result, crawled_at) VALUES (?, ?, ?)",
+                    (domain, json.dumps(result), now)
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO pages"
+                " (url, domain, fingerprint, crawled_at, final_url, etag, last_modified, extraction, llm_output)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (url, domain, record["fingerprint"], now, record.get("url"), record.get("etag"),
+                     record.get("last_modified"), json.dumps(record.get("extraction")),
+                     json.dumps(record.get("llm_output")))
+                    for url, record in (pages or {}).items()
+                ]
+            )
+
+    def page_records(self, domain: str) -> Dict[str, Dict[str, Any]]:
+        """Returns the stored page records of a domain, keyed by canonical URL."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, fingerprint, final_url, etag, last_modified, extraction, llm_output"
+                " FROM pages WHERE domain = ?", (domain,)
+            ).fetchall()
+        return {
+            url: {
+                "url": final_url or url,
+                "fingerprint": fingerprint,
+                "etag": etag,
+                "last_modified": last_modified,
+                "extraction": json.loads(extraction) if extraction else None,
+                "llm_output": json.loads(llm_output) if llm_output else None,
+            }
+            for url, fingerprint, final_url, etag, last_modified, extraction, llm_output in rows
+        }
+
+    def try_start_refresh(self, domain: str) -> bool:
+        """Claims the background refresh of a domain; False if one is already running in this process."""
+        with self._lock:
+            if domain in self._refreshing:
+                return False
+            self._refreshing.add(domain)
+            return True
+
+    def finish_refresh(self, domain: str):
+        with self._lock:
+            self._refreshing.discard(domain)
+
+
+CRAWL_STORE = CrawlStore(
+    os.environ.get("CRAWL_STORE_PATH", "data/crawl_store.sqlite3"),
+    fresh_ttl=float(os.environ.get("CRAWL_STORE_FRESH_TTL", str(6 * 3600))),
+    max_age=float(os.environ.get("CRAWL_STORE_MAX_AGE", str(7 * 24 * 3600))),
+)
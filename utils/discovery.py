@@ -0,0 +1,165 @@
+# utils/discovery.py
+import gzip
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
+
+import requests
+
+from utils.http_fetch import HTTP_SESSION
+from utils.url_tools import canonicalize_url
+
+# Well-known paths probed on every site.
+DISCOVERY_PATHS = [
+    "/apply", "/contact", "/contact-us", "/partners", "/partner", "/careers", "/jobs",
+    "/join", "/get-in-touch", "/startups", "/founders", "/about/contact",
+]
+
+# Keywords in a URL path, from most to least relevant.
+TARGET_KEYWORDS = [
+    "apply", "application", "pitch", "submit", "founder", "startup", "partner",
+    "join", "onboard", "contact", "get-in-touch", "career", "jobs",
+]
+
+
+def keyword_score(url: str) -> int:
+    """Higher for URLs whose path contains a more relevant keyword; 0 when none match."""
+    path = urlparse(url).path.lower()
+    for rank, keyword in enumerate(TARGET_KEYWORDS):
+        if keyword in path:
+            return len(TARGET_KEYWORDS) - rank
+    return 0
+
+
+def _same_host(url: str, base: str) -> bool:
+    def host(value: str) -> str:
+        name = (urlparse(value).hostname or "").lower()
+        return name[4:] if name.startswith("www.") else name
+    return host(url) == host(base)
+
+
+def _get(session: requests.Session, url: str, timeout: float) -> Optional[requests.Response]:
+    try:
+        response = session.get(url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    return response if response.status_code < 400 else None
+
+
+def sitemap_locations(base_url: str, session: requests.Session, timeout: float) -> List[str]:
+    """Sitemaps listed in robots.txt, or /sitemap.xml when robots.txt lists none."""
+    sitemaps = []
+    response = _get(session, urljoin(base_url, "/robots.txt"), timeout)
+    if response is not None:
+        for line in response.text.splitlines():
+            if line.lower().startswith("sitemap:"):
+                sitemaps.append(line.split(":", 1)[1].strip())
+    return sitemaps or [urljoin(base_url, "/sitemap.xml")]
+
+
+def fetch_sitemap_urls(base_url: str, session: requests.Session = None, timeout: float = 5,
+                       max_sitemaps: int = 10, max_urls: int = 5000) -> List[str]:
+    """Page URLs from the site's sitemaps, following sitemap indexes breadth-first up to max_sitemaps files."""
+    session = session or HTTP_SESSION
+    queue = sitemap_locations(base_url, session, timeout)
+    seen, urls = set(), []
+    while queue and len(seen) < max_sitemaps and len(urls) < max_urls:
+        sitemap_url = queue.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        response = _get(session, sitemap_url, timeout)
+        if response is None:
+            continue
+        content = response.content
+        if sitemap_url.endswith(".gz"):
+            try:
+                content = gzip.decompress(content)
+            except OSError:
+                pass
+        try:
+            root = ElementTree.fromstring(content)
+        except ElementTree.ParseError:
+            continue
+        locations = [element.text.strip() for element in root.iter() if element.tag.endswith("loc") and element.text]
+        if root.tag.endswith("sitemapindex"):
+            queue.extend(locations)
+        else:
+            urls.extend(locations[:max_urls - len(urls)])
+    return urls
+
+
+def probe_path(url: str, session: requests.Session, timeout: float) -> Optional[Dict[str, Any]]:
+    """
+    Probes a path (HEAD, falling back to GET). Returns {"url" (final), "status", "length"} when it
+    answers below 400, otherwise None; "length" is the Content-Length, or None when it is not sent.
+    """
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code in (403, 405, 501):
+            response = session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            response.close()
+    except requests.RequestException:
+        return None
+    if response.status_code >= 400:
+        return None
+    length = response.headers.get("Content-Length")
+    return {"url": response.url, "status": response.status_code, "length": int(length) if length and length.isdigit() else None}
+
+
+def is_soft_404(probe: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> bool:
+    """
+    True when a probe answers like a path that cannot exist (`baseline`), as catch-all sites (single-page
+    apps, custom 404 pages served with 200) do: same final URL, or same status and size. Without sizes to
+    compare, every probe of a catch-all site is treated as not found.
+    """
+    if baseline is None:
+        return False
+    if canonicalize_url(probe["url"]) == canonicalize_url(baseline["url"]):
+        return True
+    if probe["status"] != baseline["status"]:
+        return False
+    return probe["length"] is None or baseline["length"] is None or probe["length"] == baseline["length"]
+
+
+def discover(start_url: str, session: requests.Session = None, timeout: float = 5,
+             max_results: int = 10) -> List[Dict[str, Any]]:
+    """
+    Finds likely contact/apply/partner pages without crawling: sitemap URLs (robots.txt and sitemap.xml)
+    and well-known paths are fetched concurrently and matched against TARGET_KEYWORDS. A random path
+    that cannot exist is probed too, and well-known paths answering like it are dropped (see is_soft_404).
+    Returns [{"url", "source", "score"}] sorted by relevance; results are unverified until loaded.
+    """
+    session = session or HTTP_SESSION
+    parsed = urlparse(start_url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+    home = canonicalize_url(base_url)
+
+    with ThreadPoolExecutor(max_workers=len(DISCOVERY_PATHS) + 2) as executor:
+        sitemap_future = executor.submit(fetch_sitemap_urls, base_url, session, timeout)
+        baseline_future = executor.submit(probe_path, urljoin(base_url, f"/{uuid.uuid4().hex}"), session, timeout)
+        probe_futures = {
+            path: executor.submit(probe_path, urljoin(base_url, path), session, timeout)
+            for path in DISCOVERY_PATHS
+        }
+        baseline = baseline_future.result()
+        candidates: Dict[str, Dict[str, Any]] = {}
+        for path, future in probe_futures.items():
+            probe = future.result()
+            if probe is None or is_soft_404(probe, baseline):
+                continue
+            final_url = probe["url"]
+            # Paths that redirect to the homepage do not exist in practice.
+            if canonicalize_url(final_url) != home:
+                candidates.setdefault(canonicalize_url(final_url), {
+                    "url": final_url, "source": "probe", "score": keyword_score(final_url)
+                })
+        for url in sitemap_future.result():
+            score = keyword_score(url)
+            if score and _same_host(url, base_url):
+                candidates.setdefault(canonicalize_url(url), {"url": url, "source": "sitemap", "score": score})
+
+    ranked = sorted(candidates.values(), key=lambda item: (-item["score"], len(item["url"])))
+    return [item for item in ranked if item["score"]][:max_results]
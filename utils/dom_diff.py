@@ -0,0 +1,86 @@
+# utils/dom_diff.py
+import hashlib
+from typing import Dict, Any, List
+
+from playwright.async_api import Page
+
+# Signs every visible form control and button (tag, type, name, id, label or text) and, given the signatures
+# seen on the previous step, returns the new ones and the smallest subtree containing all of them
+# (outerHTML without scripts and styles). Used to send only what changed between wizard steps.
+DOM_DIFF_SCRIPT = """(previousKeys) => {
+    const clean = (value) => (value || '').replace(/\\s+/g, ' ').trim().slice(0, 200);
+    const visible = (el) => {
+        const style = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+    };
+    const labelOf = (el) => {
+        if (el.getAttribute('aria-label')) return el.getAttribute('aria-label');
+        if (el.labels && el.labels.length) return Array.from(el.labels).map(l => l.innerText).join(' ');
+        if (['BUTTON', 'A'].includes(el.tagName)) return el.innerText;
+        return el.getAttribute('placeholder') || '';
+    };
+    const previous = new Set(previousKeys);
+    const controls = [];
+    const fresh = [];
+    document.querySelectorAll('input, textarea, select, button, [role="button"], [contenteditable="true"]').forEach(el => {
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        if (type === 'hidden' || !visible(el)) return;
+        const control = {
+            key: [el.tagName.toLowerCase(), type, el.getAttribute('name') || '', el.id || '', clean(labelOf(el))].join('|'),
+            tag: el.tagName.toLowerCase(), type, name: el.getAttribute('name') || '', id: el.id || '',
+            label: clean(labelOf(el)),
+        };
+        controls.push(control);
+        if (!previous.has(control.key)) fresh.push(el);
+    });
+    let root = null;
+    if (fresh.length) {
+        root = fresh[0];
+        const contains = (node) => fresh.every(el => node.contains(el));
+        while (root && !contains(root)) root = root.parentElement;
+        // Widen to a container that also carries the question text, not just the bare input.
+        while (root && root.parentElement && root !== document.body && (root.innerText || '').trim().length < 40) {
+            root = root.parentElement;
+        }
+    }
+    let html = '';
+    if (root) {
+        const clone = root.cloneNode(true);
+        clone.querySelectorAll('script, style, noscript, svg').forEach(node => node.remove());
+        html = clone.outerHTML;
+    }
+    return {
+        controls,
+        newKeys: controls.filter(control => !previous.has(control.key)).map(control => control.key),
+        changedHtml: html,
+        changedIsBody: root === document.body,
+    };
+}"""
+
+
+async def dom_diff(page: Page, previous_keys: List[str]) -> Dict[str, Any]:
+    """
+    Returns {"controls", "new_controls", "changed_html", "changed_is_body", "fingerprint"} for the current page,
+    relative to the control keys of the previous step. The fingerprint hashes the sorted control keys.
+    """
+    try:
+        result = await page.evaluate(DOM_DIFF_SCRIPT, list(previous_keys))
+    except Exception:
+        result = {"controls": [], "newKeys": [], "changedHtml": "", "changedIsBody": True}
+    new_keys = set(result["newKeys"])
+    return {
+        "controls": result["controls"],
+        "new_controls": [control for control in result["controls"] if control["key"] in new_keys],
+        "changed_html": result["changedHtml"],
+        "changed_is_body": result["changedIsBody"],
+        "fingerprint": control_fingerprint(result["controls"]),
+    }
+
+
+def control_fingerprint(controls: List[Dict[str, Any]]) -> str:
+    """Stable hash of a page's visible controls, independent of their order."""
+    digest = hashlib.sha256()
+    for key in sorted(control["key"] for control in controls):
+        digest.update(key.encode("utf-8") + b"\n")
+    return digest.hexdigest()[:16]
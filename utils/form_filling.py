@@ -0,0 +1,182 @@
+# utils/form_filling.py
+from typing import Dict, Any, List
+
+from playwright.async_api import Page
+
+# Field types the batch filler never touches: buttons are clicked separately and file inputs need
+# Playwright's set_input_files.
+SKIPPED_TYPES = {"button", "reset", "submit", "image"}
+FALLBACK_TYPES = {"file"}
+
+TRUTHY_VALUES = {"true", "yes", "1", "done", "on", "checked"}
+
+# Fills every field of the plan in one page round trip. Values go through the native value setter so
+# framework-controlled inputs (React, Vue) see the change, followed by the events a user would cause.
+# Returns one {"index", "status", "error"?} entry per plan item; status is "filled", "skipped" or a failure:
+# "invalid_selector", "missing", "not_visible", "disabled", "no_option" or "rejected".
+BATCH_FILL_SCRIPT = """(plan) => {
+    const fire = (el, names) => names.forEach(name => el.dispatchEvent(new Event(name, {bubbles: true})));
+    const setNativeValue = (el, value) => {
+        const proto = Object.getPrototypeOf(el);
+        const descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+        if (descriptor && descriptor.set) { descriptor.set.call(el, value); } else { el.value = value; }
+    };
+    const visible = (el) => {
+        const style = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+    };
+    return plan.map((item, index) => {
+        let el;
+        try {
+            el = document.querySelector(item.selector);
+        } catch (e) {
+            return {index, status: 'invalid_selector', error: String(e)};
+        }
+        if (!el) return {index, status: 'missing'};
+        const type = (item.type || '').toLowerCase();
+        const value = item.value === null || item.value === undefined ? '' : item.value;
+        if (type === 'hidden') {
+            el.value = String(value);
+            return {index, status: 'filled'};
+        }
+        if (!visible(el)) return {index, status: 'not_visible'};
+        if (el.disabled || el.readOnly) return {index, status: 'disabled'};
+        try {
+            if (type === 'checkbox' || type === 'radio') {
+                const wanted = typeof value === 'boolean' ? value : item.truthy.includes(String(value).toLowerCase());
+                if (!wanted) return {index, status: 'skipped'};
+                if (!el.checked) {
+                    el.focus();
+                    el.click();
+                    if (!el.checked) { el.checked = true; fire(el, ['input', 'change']); }
+                }
+                el.blur();
+                return {index, status: el.checked ? 'filled' : 'rejected'};
+            }
+            if (el.tagName === 'SELECT' || type === 'select') {
+                const wanted = String(value).trim().toLowerCase();
+                const option = Array.from(el.options || []).find(o => o.value.toLowerCase() === wanted)
+                    || Array.from(el.options || []).find(o => o.text.trim().toLowerCase() === wanted);
+                if (!option) return {index, status: 'no_option'};
+                el.focus();
+                setNativeValue(el, option.value);
+                fire(el, ['input', 'change']);
+                el.blur();
+                return {index, status: 'filled'};
+            }
+            el.focus();
+            if (el.isContentEditable) {
+                el.textContent = String(value);
+                fire(el, ['input']);
+            } else {
+                setNativeValue(el, String(value));
+                fire(el, ['input', 'change']);
+            }
+            el.blur();
+            const current = el.isContentEditable ? el.textContent : el.value;
+            return {index, status: current === String(value) ? 'filled' : 'rejected'};
+        } catch (e) {
+            return {index, status: 'rejected', error: String(e)};
+        }
+    });
+}"""
+
+# Polls every selector in one in-page loop until all are live or the shared deadline passes.
+# A selector is live when it matches an attached element that is visible, or just attached for
+# types that are never visible (hidden and file inputs). Returns {selector: {"attached", "visible", "live", "error"?}}.
+RESOLVE_SELECTORS_SCRIPT = """async ({items, timeoutMs, pollMs}) => {
+    const visible = (el) => {
+        const style = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+    };
+    const state = {};
+    const check = () => {
+        let pending = 0;
+        for (const item of items) {
+            if (state[item.selector] && state[item.selector].live) continue;
+            let el = null;
+            try {
+                el = document.querySelector(item.selector);
+            } catch (e) {
+                state[item.selector] = {attached: false, visible: false, live: false, error: String(e)};
+                continue;
+            }
+            const isVisible = !!el && visible(el);
+            const live = !!el && (item.attachedOnly || isVisible);
+            state[item.selector] = {attached: !!el, visible: isVisible, live};
+            if (!live) pending += 1;
+        }
+        return pending;
+    };
+    const deadline = performance.now() + timeoutMs;
+    while (check() > 0 && performance.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, pollMs));
+    }
+    return state;
+}"""
+
+# Types whose element only has to be attached to count as live.
+ATTACHED_ONLY_TYPES = {"hidden", "file"}
+
+
+async def resolve_selectors(page: Page, plan: List[Dict[str, Any]], timeout: float = 5000,
+                            poll_ms: float = 100) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolves the selectors of a field plan concurrently under one deadline of `timeout` milliseconds,
+    before anything is filled. With timeout 0 the page is checked once.
+    Returns {selector: {"attached", "visible", "live", "error"?}}; selectors that fail to evaluate are not live.
+    """
+    items, seen = [], set()
+    for item in plan:
+        selector = item.get("selector")
+        if not selector or selector in seen:
+            continue
+        seen.add(selector)
+        items.append({"selector": selector, "attachedOnly": (item.get("type") or "").lower() in ATTACHED_ONLY_TYPES})
+    if not items:
+        return {}
+    try:
+        return await page.evaluate(RESOLVE_SELECTORS_SCRIPT, {"items": items, "timeoutMs": timeout, "pollMs": poll_ms})
+    except Exception as e:
+        # The page navigated or the script failed; report every selector as unresolved.
+        return {item["selector"]: {"attached": False, "visible": False, "live": False, "error": str(e)} for item in items}
+
+
+async def batch_fill(page: Page, plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Fills a field plan ([{"selector", "type", "value"}]) in a single page.evaluate call.
+    File and button fields are not sent to the page; they come back with status "fallback" and "skipped".
+    Returns one status entry per plan item, in plan order.
+    """
+    statuses: List[Dict[str, Any]] = [None] * len(plan)
+    batch, positions = [], []
+    for position, item in enumerate(plan):
+        field_type = (item.get("type") or "").lower()
+        if field_type in SKIPPED_TYPES:
+            statuses[position] = {"index": position, "status": "skipped"}
+        elif field_type in FALLBACK_TYPES:
+            statuses[position] = {"index": position, "status": "fallback"}
+        else:
+            value = item.get("value")
+            batch.append({
+                "selector": item["selector"],
+                "type": field_type,
+                "value": value if isinstance(value, (str, bool)) else ("" if value is None else str(value)),
+                "truthy": sorted(TRUTHY_VALUES),
+            })
+            positions.append(position)
+    if batch:
+        try:
+            results = await page.evaluate(BATCH_FILL_SCRIPT, batch)
+        except Exception as e:
+            results = [{"status": "rejected", "error": str(e)} for _ in batch]
+        for position, result in zip(positions, results):
+            statuses[position] = dict(result, index=position)
+    return statuses
+
+
+def failed_fields(statuses: List[Dict[str, Any]]) -> List[int]:
+    """Plan positions that need the per-field Playwright fallback."""
+    return [status["index"] for status in statuses if status["status"] not in ("filled", "skipped")]
@@ -0,0 +1,119 @@
+# utils/form_recipes.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from utils.url_tools import canonicalize_url
+
+# Field types left out of recipes: their values (CSRF tokens, nonces) belong to the page they were served with.
+UNRECORDED_TYPES = {"hidden"}
+
+
+def profile_key_for(value: Any, profile: Dict[str, Any]) -> Optional[str]:
+    """The canonical profile field a filled value came from (exact match, ignoring case and spacing)."""
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        return None
+    wanted = " ".join(str(value).split()).lower()
+    if not wanted:
+        return None
+    for key, candidate in profile.items():
+        if isinstance(candidate, (str, int, float)) and " ".join(str(candidate).split()).lower() == wanted:
+            return key
+    return None
+
+
+def record_step(fingerprint: str, form_fields: List[Dict[str, Any]], submit_button: Dict[str, Any],
+                next_step: bool, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One recipe step: the page's control fingerprint, the field plan with the profile field each value came
+    from, and the submit action. No value is stored: fields whose value came from no profile field (choices
+    included) are left empty on replay and asked for like any missing value, and hidden fields are not
+    recorded, so the page keeps the values it was served with.
+    """
+    fields = []
+    for field in form_fields:
+        if (field.get("type") or "").lower() in UNRECORDED_TYPES:
+            continue
+        entry = {key: field.get(key) for key in ("label", "name", "type", "selector")}
+        profile_key = profile_key_for(field.get("value"), profile or {})
+        if profile_key:
+            entry["profile_key"] = profile_key
+        fields.append(entry)
+    return {
+        "fingerprint": fingerprint,
+        "fields": fields,
+        "submit": {"selector": submit_button.get("selector"), "text": submit_button.get("text", ""), "next_step": next_step},
+    }
+
+
+def replay_fields(step: Dict[str, Any], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The field plan of a recipe step with values taken from the (new) profile; other fields are empty."""
+    fields = []
+    for entry in step["fields"]:
+        if (entry.get("type") or "").lower() in UNRECORDED_TYPES:
+            continue
+        field = {key: entry.get(key) for key in ("label", "name", "type", "selector")}
+        value = profile.get(entry["profile_key"]) if entry.get("profile_key") else ""
+        field["value"] = value if isinstance(value, (str, bool)) else ("" if value is None else str(value))
+        fields.append(field)
+    return fields
+
+
+class RecipeStore:
+    """
+    Versioned form recipes (SQLite) keyed by canonical form URL: every successful submission that needed
+    the LLM for at least one step saves a new version, and the latest version is replayed.
+    A recipe is {"form_url", "steps": [record_step(...)], "confirmation": {"signal", "detail"}}.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS recipes ("
+                " form_key TEXT NOT NULL, version INTEGER NOT NULL, recipe TEXT NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (form_key, version))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def latest(self, form_url: str) -> Optional[Dict[str, Any]]:
+        """Returns the latest recipe of a form with its "version", or None."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT recipe, version FROM recipes WHERE form_key = ? ORDER BY version DESC LIMIT 1",
+                (canonicalize_url(form_url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(json.loads(row[0]), version=row[1])
+
+    def save(self, form_url: str, recipe: Dict[str, Any]) -> int:
+        """Saves a recipe as the next version of its form. Returns the version."""
+        form_key = canonicalize_url(form_url)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT MAX(version) FROM recipes WHERE form_key = ?", (form_key,)).fetchone()
+            version = (row[0] or 0) + 1
+            conn.execute(
+                "INSERT INTO recipes (form_key, version, recipe, created_at) VALUES (?, ?, ?, ?)",
+                (form_key, version, json.dumps(recipe), time.time())
+            )
+        return version
+
+
+RECIPE_STORE = RecipeStore(os.environ.get("RECIPE_STORE_PATH", "data/form_recipes.sqlite3"))
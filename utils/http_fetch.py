@@ -0,0 +1,136 @@
+# utils/http_fetch.py
+import re
+from typing import Dict, Any, List, Optional
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+GENERIC_ANCHOR_TEXTS = {"continue", "click", "read more", "learn more"}
+
+# Markers of single-page apps whose content only exists after JavaScript runs.
+CLIENT_RENDERED_MARKERS = [
+    'id="root"', 'id="app"', 'id="__next"', 'id="__nuxt"', "data-reactroot", "ng-app", "ng-version",
+    "enable javascript", "javascript is required", "you need to enable javascript",
+]
+
+# Below this many characters of visible text a page is treated as client-rendered.
+MIN_TEXT_LENGTH = 200
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+
+def create_session(pool_size: int = 50) -> requests.Session:
+    """Creates a requests session with a shared connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    return session
+
+
+HTTP_SESSION = create_session()
+
+
+def looks_client_rendered(html: str, text: str) -> bool:
+    """Heuristic: an (almost) empty body or a known framework mount point with little text."""
+    if len(text) < MIN_TEXT_LENGTH:
+        return True
+    lowered = html.lower()
+    return len(text) < MIN_TEXT_LENGTH * 5 and any(marker in lowered for marker in CLIENT_RENDERED_MARKERS)
+
+
+def _anchor_context(anchor) -> str:
+    """Text of the nearest parent <div>, prefixed with nearby headings when the anchor text is generic."""
+    parent = anchor.find_parent("div")
+    context_text = parent.get_text(" ", strip=True) if parent else ""
+    if anchor.get_text(strip=True).lower() in GENERIC_ANCHOR_TEXTS:
+        for ancestor in anchor.parents:
+            headers = ancestor.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]) if hasattr(ancestor, "find_all") else []
+            if headers:
+                context_text = " ".join(h.get_text(" ", strip=True) for h in headers) + " " + context_text
+                break
+    return context_text.strip()
+
+
+def parse_page(url: str, html: str) -> Dict[str, Any]:
+    """Extracts body text, anchors (url, text, context) and email addresses from raw HTML."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    body = soup.body or soup
+    text = body.get_text("\n", strip=True)
+
+    anchors: List[Dict[str, str]] = []
+    emails = set(EMAIL_PATTERN.findall(html))
+    for anchor in body.find_all("a"):
+        href = anchor.get("href")
+        if not href:
+            continue
+        if href.lower().startswith("mailto:"):
+            address = href[len("mailto:"):].split("?", 1)[0].strip()
+            if EMAIL_PATTERN.fullmatch(address):
+                emails.add(address)
+        try:
+            absolute = urljoin(url, href)
+        except ValueError:
+            # Unparseable href (e.g. "http://[::1"); the browser path skips these too.
+            continue
+        anchors.append({
+            "url": absolute,
+            "text": anchor.get_text(" ", strip=True),
+            "context": _anchor_context(anchor),
+        })
+    return {"text": text, "anchors": anchors, "emails": emails}
+
+
+def fetch_page(url: str, timeout: float = 10, session: requests.Session = None,
+               etag: str = None, last_modified: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetches a page over plain HTTP and parses it.
+    With `etag` / `last_modified` from an earlier fetch the request is conditional, and a
+    304 response returns {"url", "not_modified": True, "bytes"} without parsing.
+    Returns None when the page needs a real browser: request errors, non-HTML responses
+    or pages that look client-rendered.
+    """
+    session = session or HTTP_SESSION
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        response = session.get(url, timeout=timeout, allow_redirects=True, headers=headers)
+    except requests.RequestException:
+        return None
+    if response.status_code == 304:
+        return {"url": response.url, "not_modified": True, "bytes": len(response.content), "source": "http"}
+    content_type = response.headers.get("Content-Type", "")
+    if response.status_code >= 400 or "html" not in content_type.lower():
+        return None
+    html = response.text
+    parsed = parse_page(response.url, html)
+    if looks_client_rendered(html, parsed["text"]):
+        return None
+    return {
+        "url": response.url,
+        "content": html,
+        "body": parsed["text"],
+        "anchors": parsed["anchors"],
+        "emails": parsed["emails"],
+        "bytes": len(response.content),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "source": "http",
+    }
@@ -0,0 +1,98 @@
+# utils/link_index.py
+import re
+import math
+from collections import Counter
+from typing import Dict, Any, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+# Terms describing the pages the crawler is looking for.
+TARGET_QUERY = (
+    "apply application join contact form typeform jotform airtable hubspot "
+    "partner partnership onboarding founders startup submit pitch accelerator"
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def link_tokens(link: Dict[str, Any]) -> List[str]:
+    """Tokens for a link: anchor text and URL weigh double, surrounding context is truncated."""
+    parsed = urlparse(link.get("url", ""))
+    anchor = tokenize(link.get("text", ""))
+    url_terms = tokenize(parsed.netloc + " " + parsed.path)
+    context = tokenize(link.get("context", "")[:300]) + tokenize(link.get("description", ""))
+    return anchor * 2 + url_terms * 2 + context
+
+
+class LinkIndex:
+    """
+    Per-session BM25 index over candidate links and their context.
+    Used to pick the next crawl target locally when one link clearly outranks the rest.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, Counter] = {}
+        self.links: Dict[str, Dict[str, Any]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.doc_freq: Counter = Counter()
+
+    def add(self, link: Dict[str, Any]):
+        url = link.get("url")
+        if not url:
+            return
+        if url in self.docs:
+            self.doc_freq.subtract(self.docs[url].keys())
+        tokens = link_tokens(link)
+        self.docs[url] = Counter(tokens)
+        self.lengths[url] = len(tokens)
+        self.links[url] = link
+        self.doc_freq.update(self.docs[url].keys())
+
+    def add_many(self, links: List[Dict[str, Any]]):
+        for link in links:
+            self.add(link)
+
+    def search(self, query: str = TARGET_QUERY, exclude: Set[str] = frozenset()) -> List[Tuple[float, Dict[str, Any]]]:
+        """Returns (score, link) pairs sorted by descending BM25 score, skipping excluded URLs."""
+        if not self.docs:
+            return []
+        total = len(self.docs)
+        avg_len = sum(self.lengths.values()) / total or 1.0
+        terms = set(tokenize(query))
+        results = []
+        for url, counts in self.docs.items():
+            if url in exclude:
+                continue
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term, 0)
+                if not tf:
+                    continue
+                df = self.doc_freq[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[url] / avg_len)
+                score += idf * tf * (self.k1 + 1) / norm
+            if score > 0:
+                results.append((score, self.links[url]))
+        results.sort(key=lambda item: item[0], reverse=True)
+        return results
+
+    def confident_pick(self, margin: float, min_score: float, query: str = TARGET_QUERY,
+                       exclude: Set[str] = frozenset()) -> Tuple[Optional[Dict[str, Any]], float, float]:
+        """
+        Returns (link, top_score, runner_up_score).
+        link is None unless the top score reaches min_score and is at least `margin` times the runner-up.
+        """
+        ranked = self.search(query, exclude)
+        if not ranked:
+            return None, 0.0, 0.0
+        top_score, top_link = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if top_score >= min_score and top_score >= runner_up * margin:
+            return top_link, top_score, runner_up
+        return None, top_score, runner_up
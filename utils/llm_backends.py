@@ -0,0 +1,252 @@
+# utils/llm_backends.py
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+
+
+class LLMResponse:
+    """Text returned by a backend plus token usage (estimated when the backend does not report it)."""
+
+    def __init__(self, text: str, prompt_tokens: int = 0, output_tokens: int = 0):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def fixture_key(model_name: str, prompt: str) -> str:
+    """Stable key used to store and look up recorded responses."""
+    return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMBackend:
+    """Interface implemented by every LLM provider used by the agents."""
+
+    name = "base"
+
+    def generate(self, model_name: str, prompt: str, file_paths: List[str] = [],
+                 generation_config: Dict[str, Any] = None, task: str = "default",
+                 prefix: str = None) -> LLMResponse:
+        """
+        Generates a response for `prompt`.
+        `prefix` is a stable instruction block that precedes the prompt. Every backend sends it as the
+        leading part of the same prompt text, so the model sees one prompt shape however it is served.
+        """
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini via google.generativeai. The API key is read from GEMINI_API_KEY.
+    The prompt prefix is sent inline ahead of the prompt.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str = None):
+        import google.generativeai as genai
+        self.genai = genai
+        self.genai.configure(api_key=api_key or os.environ.get("GEMINI_API_KEY"))
+        self._models: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def get_model(self, model_name: str, generation_config: Dict[str, Any] = None):
+        key = (model_name, json.dumps(generation_config or {}, sort_keys=True))
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = self.genai.GenerativeModel(
+                    model_name=model_name,
+                    generation_config=generation_config
+                )
+            return self._models[key]
+
+    def generate(self, model_name: str, prompt: str, file_paths: List[str] = [],
+                 generation_config: Dict[str, Any] = None, task: str = "default",
+                 prefix: str = None) -> LLMResponse:
+        model = self.get_model(model_name, generation_config)
+        return self._generate(model, (prefix or "") + prompt, file_paths)
+
+    def _generate(self, model, prompt: str, file_paths: List[str]) -> LLMResponse:
+        if file_paths:
+            uploaded_files = [self.genai.upload_file(file) for file in file_paths]
+            response = model.generate_content([prompt] + uploaded_files)
+        else:
+            response = model.generate_content(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimate_tokens(prompt)
+        output_tokens = getattr(usage, "candidates_token_count", 0) or estimate_tokens(response.text)
+        return LLMResponse(response.text, prompt_tokens, output_tokens)
+
+
+class RecordingBackend(LLMBackend):
+    """Wraps another backend and writes each response to a fixtures directory for later replay by StubBackend."""
+
+    def __init__(self, inner: LLMBackend, fixtures_dir: str):
+        self.inner = inner
+        self.name = f"{inner.name}+recording"
+        self.fixtures_dir = fixtures_dir
+        os.makedirs(fixtures_dir, exist_ok=True)
+
+    def generate(self, model_name: str, prompt: str, file_paths: List[str] = [],
+                 generation_config: Dict[str, Any] = None, task: str = "default",
+                 prefix: str = None) -> LLMResponse:
+        response = self.inner.generate(model_name, prompt, file_paths, generation_config, task, prefix)
+        path = os.path.join(self.fixtures_dir, f"{fixture_key(model_name, (prefix or '') + prompt)}.json")
+        with open(path, "w") as f:
+            json.dump({"model": model_name, "task": task, "text": response.text}, f)
+        return response
+
+
+class StubBackend(LLMBackend):
+    """
+    Offline, deterministic backend for benchmarks and load tests.
+    Answers from recorded fixtures when one matches the prompt, otherwise from per-task heuristics.
+    Latency is injected as `latency_ms` plus a jitter that is seeded by the prompt, so runs are repeatable.
+    """
+
+    name = "stub"
+
+    def __init__(self, fixtures_dir: str = None, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    def generate(self, model_name: str, prompt: str, file_paths: List[str] = [],
+                 generation_config: Dict[str, Any] = None, task: str = "default",
+                 prefix: str = None) -> LLMResponse:
+        prompt = (prefix or "") + prompt
+        self._sleep(prompt)
+        text = self._from_fixture(model_name, prompt)
+        if text is None:
+            handler = getattr(self, f"_answer_{task}", None)
+            text = handler(prompt) if handler else "{}"
+        return LLMResponse(text, estimate_tokens(prompt), estimate_tokens(text))
+
+    def _sleep(self, prompt: str):
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += random.Random(prompt).uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _from_fixture(self, model_name: str, prompt: str) -> Optional[str]:
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, f"{fixture_key(model_name, prompt)}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f).get("text")
+
+    @staticmethod
+    def _extract_links(prompt: str) -> List[Dict[str, str]]:
+        links = []
+        for match in re.finditer(r'"url":\s*"([^"]+)",\s*"text":\s*"([^"]*)"', prompt):
+            links.append({"url": match.group(1), "text": match.group(2)})
+        return links
+
+    def _answer_navigation(self, prompt: str) -> str:
+        for link in self._extract_links(prompt):
+            if re.search(r"contact|join|apply|typeform|forms", (link["text"] + " " + link["url"]).lower()):
+                return json.dumps({"action": "click", "link": link["url"], "reason": "Stub: keyword match."})
+        return json.dumps({"action": "stop", "reason": "Stub: no matching link."})
+
+    def _answer_link_descriptions(self, prompt: str) -> str:
+        return json.dumps([
+            {"url": link["url"], "description": f"Link '{link['text'] or link['url']}'."}
+            for link in self._extract_links(prompt)
+        ])
+
+    def _answer_profile_normalization(self, prompt: str) -> str:
+        fields = re.findall(r"^- (\w+): ", prompt, re.MULTILINE)
+        raw = prompt.split("Profile:\n", 1)[-1]
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            data = None
+        profile = {field: None for field in fields}
+        if not isinstance(data, dict):
+            profile["other"] = raw.strip()
+            return json.dumps(profile)
+        rest = []
+        for key, value in data.items():
+            words = re.sub(r"[^a-z0-9]+", "_", key.lower()).strip("_")
+            field = next((field for field in fields if field == words or field.split("_")[-1] == words), None)
+            if field and profile[field] is None:
+                profile[field] = value
+            else:
+                rest.append(f"{key}: {value}")
+        profile["other"] = "\n".join(rest) or None
+        return json.dumps(profile)
+
+    def _answer_form_mapping(self, prompt: str) -> str:
+        html = re.split(r"(?:HTML Content|Changed HTML):", prompt, maxsplit=1)[-1]
+        fields = []
+        for match in re.finditer(r"<(input|textarea|select)\b([^>]*)>", html, re.IGNORECASE):
+            tag, attrs = match.group(1).lower(), match.group(2)
+            field_type = tag if tag != "input" else (re.search(r'type="([^"]+)"', attrs) or [None, "text"])[1]
+            if field_type in ("hidden", "submit", "button", "reset", "image"):
+                continue
+            field_id = re.search(r'id="([^"]+)"', attrs)
+            field_name = re.search(r'name="([^"]+)"', attrs)
+            if field_id:
+                selector = f"#{field_id.group(1)}"
+            elif field_name:
+                selector = f"[name=\"{field_name.group(1)}\"]"
+            else:
+                continue
+            name = field_name.group(1) if field_name else field_id.group(1)
+            value = "founder@example.com" if field_type == "email" else "Example Startup"
+            if field_type in ("checkbox", "radio"):
+                value = "yes"
+            fields.append({"label": name, "name": name, "type": field_type, "selector": selector, "value": value})
+        return json.dumps({
+            "fields": fields,
+            "submit_button": {"text": "Submit", "selector": "button[type='submit']"},
+            "confirmation_strategies": [{"strategy": "success_message", "description": "Stub strategy."}],
+        })
+
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """
+    Returns the process-wide backend selected by environment variables:
+      LLM_BACKEND            "gemini" (default) or "stub"
+      LLM_FIXTURES_DIR       fixtures replayed by the stub backend
+      LLM_RECORD_DIR         when set with the gemini backend, responses are recorded here
+      LLM_STUB_LATENCY_MS    injected latency for the stub backend
+      LLM_STUB_JITTER_MS     extra deterministic jitter for the stub backend
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if os.environ.get("LLM_BACKEND", "gemini").lower() == "stub":
+                _backend = StubBackend(
+                    fixtures_dir=os.environ.get("LLM_FIXTURES_DIR"),
+                    latency_ms=float(os.environ.get("LLM_STUB_LATENCY_MS", "0")),
+                    jitter_ms=float(os.environ.get("LLM_STUB_JITTER_MS", "0")),
+                )
+            else:
+                _backend = GeminiBackend()
+                if os.environ.get("LLM_RECORD_DIR"):
+                    _backend = RecordingBackend(_backend, os.environ["LLM_RECORD_DIR"])
+        return _backend
+
+
+def set_backend(backend: LLMBackend):
+    """Overrides the process-wide backend (e.g. from a benchmark harness)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,211 @@
+# utils/model_router.py
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Callable, Optional
+
+from utils.llm_backends import LLMBackend, get_backend
+from utils.single_flight import SingleFlight, SingleFlightCancelled
+
+FAST_MODEL = "gemini-2.0-flash-exp"
+STRONG_MODEL = "gemini-1.5-pro"
+
+DEFAULT_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+    "response_mime_type": "application/json",
+}
+
+# Prompts (prefix included) longer than this, in characters, go straight to the strong model.
+# Past this size the fast model's answers mostly fail validation and end up escalated anyway.
+FAST_PROMPT_CHAR_LIMIT = 120000
+
+# Lower limits for tasks whose long prompts the fast model handles poorly. A full form page
+# (form_mapping without a step diff) is the call most often escalated after selector checks.
+TASK_FAST_PROMPT_CHAR_LIMITS: Dict[str, int] = {
+    "form_mapping": 40000,
+}
+
+# Calls with attachments (the form-page screenshot) use this fraction of their limit.
+ATTACHMENT_LIMIT_FACTOR = 0.5
+
+
+class ModelStats:
+    """Thread-safe per-model latency and success counters shared by all sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, model_name: str, task: str, latency: float, ok: bool, escalated: bool = False):
+        with self._lock:
+            entry = self._stats.setdefault(model_name, {
+                "calls": 0,
+                "successes": 0,
+                "failures": 0,
+                "escalations": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+                "tasks": {},
+            })
+            entry["calls"] += 1
+            entry["successes" if ok else "failures"] += 1
+            if escalated:
+                entry["escalations"] += 1
+            entry["total_latency"] += latency
+            entry["max_latency"] = max(entry["max_latency"], latency)
+            entry["tasks"][task] = entry["tasks"].get(task, 0) + 1
+
+    def record_failure(self, model_name: str):
+        """Marks a call that parsed fine but later proved wrong (e.g. selectors missing on the page)."""
+        with self._lock:
+            entry = self._stats.get(model_name)
+            if entry:
+                entry["successes"] -= 1
+                entry["failures"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {}
+            for model_name, entry in self._stats.items():
+                result[model_name] = dict(entry, tasks=dict(entry["tasks"]))
+                result[model_name]["avg_latency"] = entry["total_latency"] / entry["calls"] if entry["calls"] else 0.0
+            return result
+
+
+MODEL_STATS = ModelStats()
+
+# Identical prompts sent concurrently by different sessions share one backend request.
+LLM_REQUESTS = SingleFlight()
+
+
+class ModelRouter:
+    """
+    Routes each LLM call to the cheapest suitable model.
+    Calls go to the fast model unless the prompt is over the task's size limit,
+    and are retried on the strong model when the response is not valid JSON or fails validation.
+    """
+
+    def __init__(self, fast_model: str = FAST_MODEL, strong_model: str = STRONG_MODEL,
+                 generation_config: Dict[str, Any] = None, log: Callable[[str], None] = None,
+                 backend: LLMBackend = None):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.generation_config = generation_config or DEFAULT_GENERATION_CONFIG
+        self.log = log
+        self.backend = backend or get_backend()
+        self.last_model: Optional[str] = None
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.cancel_event = threading.Event()
+
+    def select_model(self, prompt: str, task: str, file_paths: List[str] = ()) -> str:
+        """Picks the model for a call from the prompt size, against the task's limit (lower with attachments)."""
+        limit = TASK_FAST_PROMPT_CHAR_LIMITS.get(task, FAST_PROMPT_CHAR_LIMIT)
+        if file_paths:
+            limit = int(limit * ATTACHMENT_LIMIT_FACTOR)
+        if len(prompt) > limit:
+            return self.strong_model
+        return self.fast_model
+
+    def cancel(self):
+        """Stops this router from waiting on calls shared with other sessions."""
+        self.cancel_event.set()
+
+    def request_key(self, model_name: str, prompt: str, file_paths: List[str], prefix: str = None) -> str:
+        """Cache key for coalescing: backend, model, config, prompt and the content of attached files."""
+        digest = hashlib.sha256()
+        digest.update(f"{self.backend.name}\n{model_name}\n".encode("utf-8"))
+        digest.update(json.dumps(self.generation_config, sort_keys=True).encode("utf-8"))
+        digest.update((prefix or "").encode("utf-8"))
+        digest.update(prompt.encode("utf-8"))
+        for path in file_paths:
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def _call(self, model_name: str, prompt: str, file_paths: List[str], task: str, prefix: str = None) -> str:
+        response, shared = LLM_REQUESTS.do(
+            self.request_key(model_name, prompt, file_paths, prefix),
+            lambda: self.backend.generate(model_name, prompt, file_paths, self.generation_config, task, prefix),
+            cancel_event=self.cancel_event
+        )
+        if shared:
+            self._log(f"Reused an in-flight {model_name} request for '{task}'.")
+        else:
+            self.prompt_tokens += response.prompt_tokens
+            self.output_tokens += response.output_tokens
+        return response.text
+
+    def generate(self, prompt: str, task: str = "default", file_paths: List[str] = [],
+                 validate: Callable[[Any], bool] = None, prefix: str = None) -> str:
+        """
+        Generates content on the routed model.
+        `prefix` is the static instruction block preceding `prompt`; it is part of the request key.
+        If the response is not valid JSON or `validate` rejects it, the call is repeated once on the strong model.
+        Returns the raw response text of the last attempt.
+        """
+        model_name = self.select_model((prefix or "") + prompt, task, file_paths)
+        text = self._attempt(model_name, prompt, task, file_paths, validate, escalated=False, prefix=prefix)
+        if text is not None:
+            return text
+        if model_name != self.strong_model:
+            self._log(f"Escalating '{task}' from {model_name} to {self.strong_model}.")
+            text = self._attempt(self.strong_model, prompt, task, file_paths, validate, escalated=True, prefix=prefix)
+            if text is not None:
+                return text
+        return self._last_text
+
+    def escalate(self, prompt: str, task: str = "default", file_paths: List[str] = [],
+                 validate: Callable[[Any], bool] = None, prefix: str = None) -> Optional[str]:
+        """
+        Re-runs a call on the strong model after its fast-model answer failed downstream
+        (e.g. the returned selectors do not exist on the page).
+        Returns None if the last call already used the strong model.
+        """
+        if self.last_model == self.strong_model:
+            return None
+        MODEL_STATS.record_failure(self.last_model)
+        self._log(f"Escalating '{task}' from {self.last_model} to {self.strong_model}.")
+        text = self._attempt(self.strong_model, prompt, task, file_paths, validate, escalated=True, prefix=prefix)
+        return text if text is not None else self._last_text
+
+    def _attempt(self, model_name: str, prompt: str, task: str, file_paths: List[str],
+                 validate: Callable[[Any], bool], escalated: bool, prefix: str = None) -> Optional[str]:
+        """Runs one call and records its stats. Returns the text if it is usable, otherwise None."""
+        self.last_model = model_name
+        self._last_text = ""
+        start = time.monotonic()
+        try:
+            text = self._call(model_name, prompt, file_paths, task, prefix)
+        except SingleFlightCancelled:
+            # This router stopped waiting on purpose: not a model failure, and nothing to escalate.
+            raise
+        except Exception as e:
+            MODEL_STATS.record(model_name, task, time.monotonic() - start, ok=False, escalated=escalated)
+            self._log(f"{model_name} call for '{task}' failed: {str(e)}")
+            if model_name == self.strong_model:
+                raise
+            return None
+        latency = time.monotonic() - start
+        self._last_text = text
+
+        ok = True
+        try:
+            data = json.loads(text)
+            if validate is not None and not validate(data):
+                ok = False
+                self._log(f"{model_name} response for '{task}' violated the expected schema.")
+        except json.JSONDecodeError:
+            ok = False
+            self._log(f"{model_name} response for '{task}' was not valid JSON.")
+
+        MODEL_STATS.record(model_name, task, latency, ok=ok, escalated=escalated)
+        return text if ok else None
+
+    def _log(self, message: str):
+        if self.log:
+            self.log(message)
@@ -0,0 +1,103 @@
+# utils/page_readiness.py
+import asyncio
+from typing import Dict, Any, Optional
+
+from playwright.async_api import Page, Request
+
+# Installs (once per document) a MutationObserver and returns milliseconds since the last DOM mutation.
+DOM_IDLE_SCRIPT = """() => {
+    if (!window.__readinessObserver) {
+        window.__lastMutation = performance.now();
+        window.__readinessObserver = new MutationObserver(() => { window.__lastMutation = performance.now(); });
+        window.__readinessObserver.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    }
+    return performance.now() - window.__lastMutation;
+}"""
+
+
+class NetworkTracker:
+    """Counts in-flight requests of a page and remembers when network activity last happened."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.in_flight = 0
+        self.last_activity = asyncio.get_event_loop().time()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request: Request):
+        self.in_flight += 1
+        self.last_activity = asyncio.get_event_loop().time()
+
+    def _on_done(self, request: Request):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.last_activity = asyncio.get_event_loop().time()
+
+    def idle_for(self) -> float:
+        """Seconds the network has been quiet, or 0 while requests are in flight."""
+        if self.in_flight:
+            return 0.0
+        return asyncio.get_event_loop().time() - self.last_activity
+
+    def detach(self):
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_done)
+        self.page.remove_listener("requestfailed", self._on_done)
+
+
+async def wait_until_ready(page: Page, timeout: float = 10000, selector: str = None,
+                           load_state: str = "domcontentloaded", network_quiet_ms: float = 500,
+                           dom_quiet_ms: float = 300, tracker: Optional[NetworkTracker] = None,
+                           poll_ms: float = 50) -> Dict[str, Any]:
+    """
+    Waits until the page is ready, all under one deadline of `timeout` milliseconds:
+      1. the load state event has fired,
+      2. `selector` (if given) is attached,
+      3. no request has been in flight for `network_quiet_ms`, and
+      4. the DOM has not mutated for `dom_quiet_ms`.
+    Never raises; returns which conditions were met and how long the wait took.
+    Pass a long-lived NetworkTracker to account for requests started before the call.
+    """
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    deadline = start + timeout / 1000.0
+    own_tracker = tracker is None
+    if own_tracker:
+        tracker = NetworkTracker(page)
+
+    def remaining_ms() -> float:
+        return max(0.0, (deadline - loop.time()) * 1000.0)
+
+    status = {"load_state": False, "selector": selector is None, "network_idle": False, "dom_idle": False}
+    try:
+        try:
+            await page.wait_for_load_state(load_state, timeout=remaining_ms() or 1)
+            status["load_state"] = True
+        except Exception:
+            pass
+
+        if selector and remaining_ms():
+            try:
+                await page.wait_for_selector(selector, state="attached", timeout=remaining_ms())
+                status["selector"] = True
+            except Exception:
+                pass
+
+        while remaining_ms():
+            status["network_idle"] = tracker.idle_for() * 1000.0 >= network_quiet_ms
+            try:
+                status["dom_idle"] = await page.evaluate(DOM_IDLE_SCRIPT) >= dom_quiet_ms
+            except Exception:
+                # The document is being replaced (navigation in progress); keep waiting.
+                status["dom_idle"] = False
+            if status["network_idle"] and status["dom_idle"]:
+                break
+            await asyncio.sleep(min(poll_ms, remaining_ms()) / 1000.0)
+    finally:
+        if own_tracker:
+            tracker.detach()
+
+    status["ready"] = all(status[key] for key in ("load_state", "selector", "network_idle", "dom_idle"))
+    status["elapsed_ms"] = int((loop.time() - start) * 1000)
+    return status
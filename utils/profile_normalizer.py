@@ -0,0 +1,192 @@
+# utils/profile_normalizer.py
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from utils.selector_repair import normalize
+
+# Canonical profile fields and what the normalization call should put in them.
+PROFILE_TAXONOMY: Dict[str, str] = {
+    "company_name": "Legal or trading name of the startup.",
+    "website": "Company website URL.",
+    "one_liner": "One-sentence pitch.",
+    "description": "Longer description of the product and business.",
+    "industry": "Sector or industry.",
+    "business_model": "B2B, B2C, marketplace, SaaS and so on.",
+    "founders": "List of {\"name\", \"role\", \"email\", \"linkedin\"} objects.",
+    "contact_name": "Full name of the person submitting.",
+    "contact_first_name": "First name of the person submitting.",
+    "contact_last_name": "Last name of the person submitting.",
+    "contact_email": "Email address of the person submitting.",
+    "contact_phone": "Phone number of the person submitting.",
+    "contact_role": "Job title of the person submitting.",
+    "country": "Country of the company.",
+    "city": "City of the company.",
+    "founded_year": "Year the company was founded.",
+    "team_size": "Number of employees.",
+    "funding_stage": "Pre-seed, seed, Series A and so on.",
+    "amount_raising": "Amount the company is currently raising.",
+    "amount_raised": "Total funding raised so far.",
+    "valuation": "Current or target valuation.",
+    "revenue": "Revenue or ARR.",
+    "traction": "Users, growth and other traction metrics.",
+    "pitch_deck_url": "Link to the pitch deck.",
+    "linkedin_url": "Company LinkedIn URL.",
+    "twitter_url": "Company Twitter/X URL.",
+    "other": "Anything in the profile that fits none of the fields above, as text.",
+}
+
+# Words in a form control's label, name or id that make a profile field relevant to it.
+FIELD_KEYWORDS: Dict[str, List[str]] = {
+    "company_name": ["company", "startup", "organization", "organisation", "business", "venture", "brand"],
+    "website": ["website", "url", "site", "web", "domain"],
+    "one_liner": ["one liner", "tagline", "pitch", "summary", "elevator", "short description"],
+    "description": ["description", "describe", "about", "what do you do", "product", "problem", "solution", "message"],
+    "industry": ["industry", "sector", "vertical", "category", "market"],
+    "business_model": ["business model", "model", "b2b", "b2c", "revenue model"],
+    "founders": ["founder", "founders", "co founder", "ceo", "cto", "team"],
+    "contact_name": ["name", "full name", "your name", "contact"],
+    "contact_first_name": ["first name", "first", "given name", "fname"],
+    "contact_last_name": ["last name", "last", "surname", "family name", "lname"],
+    "contact_email": ["email", "e mail", "mail"],
+    "contact_phone": ["phone", "mobile", "telephone", "tel", "cell", "whatsapp"],
+    "contact_role": ["role", "title", "position", "job"],
+    "country": ["country", "location", "nation", "hq", "headquarters"],
+    "city": ["city", "location", "town", "hq", "headquarters"],
+    "founded_year": ["founded", "year", "inception", "established"],
+    "team_size": ["team size", "employees", "headcount", "staff", "team"],
+    "funding_stage": ["stage", "round", "funding stage", "series"],
+    "amount_raising": ["raising", "raise", "ask", "round size", "investment"],
+    "amount_raised": ["raised", "funding", "capital", "investors"],
+    "valuation": ["valuation", "cap", "pre money", "post money"],
+    "revenue": ["revenue", "arr", "mrr", "sales", "income"],
+    "traction": ["traction", "users", "customers", "growth", "metrics", "kpi"],
+    "pitch_deck_url": ["deck", "pitch deck", "presentation", "slides"],
+    "linkedin_url": ["linkedin"],
+    "twitter_url": ["twitter", "x com", "social"],
+}
+
+# Bump when the taxonomy or the normalization prompt changes, so stored profiles are rebuilt.
+TAXONOMY_VERSION = 1
+
+PROFILE_NORMALIZATION_PROMPT_PREFIX = (
+    "You are given a startup profile supplied by a user in arbitrary format (JSON, key-value pairs or free text). "
+    "Rewrite it into the canonical fields below. Copy values as given; do not invent or embellish anything. "
+    "Use null for fields the profile does not provide, and put whatever fits no field into \"other\".\n\n"
+    "Fields:\n"
+    + "".join(f"- {key}: {description}\n" for key, description in PROFILE_TAXONOMY.items())
+    + "\nReturn only a JSON object with exactly these keys.\n\n"
+)
+
+
+def profile_hash(input_data: Any) -> str:
+    """Content hash of a raw profile (and the taxonomy version); the key of its normalized form."""
+    raw = input_data if isinstance(input_data, str) else json.dumps(input_data, sort_keys=True)
+    return hashlib.sha256(f"{TAXONOMY_VERSION}\n{raw}".encode("utf-8")).hexdigest()
+
+
+def is_valid_profile(profile: Any) -> bool:
+    return isinstance(profile, dict) and any(key in PROFILE_TAXONOMY for key in profile)
+
+
+def _filled(value: Any) -> bool:
+    return value not in (None, "", [], {})
+
+
+class ProfileStore:
+    """Normalized profiles (SQLite) keyed by profile_hash, shared by all sessions and forms."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                " hash TEXT PRIMARY KEY, profile TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT profile FROM profiles WHERE hash = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, profile: Dict[str, Any]):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (hash, profile, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(profile), time.time())
+            )
+
+
+PROFILE_STORE = ProfileStore(os.environ.get("PROFILE_STORE_PATH", "data/profiles.sqlite3"))
+
+
+def normalize_profile(input_data: Any, router, store: ProfileStore = PROFILE_STORE) -> Optional[Dict[str, Any]]:
+    """
+    Returns the canonical form of a raw profile ({taxonomy key: value}, empty fields dropped), calling the
+    LLM only the first time a profile version is seen. Concurrent first calls with the same profile (a bulk
+    run) send identical prompts and share one request through the router. Returns None, and stores nothing,
+    when the response is not a valid profile or has no filled field; callers then fall back to the raw input.
+    """
+    key = profile_hash(input_data)
+    profile = store.get(key)
+    if profile:
+        return profile
+    raw = input_data if isinstance(input_data, str) else json.dumps(input_data, indent=2)
+    response = router.generate(
+        f"Profile:\n{raw}", task="profile_normalization", validate=is_valid_profile,
+        prefix=PROFILE_NORMALIZATION_PROMPT_PREFIX
+    )
+    try:
+        profile = json.loads(response)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not is_valid_profile(profile):
+        return None
+    profile = {field: value for field, value in profile.items() if field in PROFILE_TAXONOMY and _filled(value)}
+    if not profile:
+        return None
+    store.put(key, profile)
+    return profile
+
+
+def relevant_profile(profile: Dict[str, Any], controls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The profile fields relevant to a page, from its controls' labels, names and ids (as listed by dom_diff).
+    "other" is added when some input matches no field; the whole profile is returned when nothing matches.
+    """
+    relevant = set()
+    unmatched_inputs = 0
+    for control in controls:
+        if control.get("tag") == "button" or control.get("type") in ("button", "submit", "reset", "image"):
+            continue
+        text = " ".join(normalize(control.get(key) or "") for key in ("label", "name", "id"))
+        matched = {
+            field for field, keywords in FIELD_KEYWORDS.items()
+            if any(re.search(rf"\b{re.escape(normalize(keyword))}\b", text) for keyword in keywords)
+        }
+        if not matched:
+            unmatched_inputs += 1
+        relevant |= matched
+    if unmatched_inputs:
+        relevant.add("other")
+    selected = {field: value for field, value in profile.items() if field in relevant}
+    return selected or dict(profile)
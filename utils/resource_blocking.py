@@ -0,0 +1,126 @@
+# utils/resource_blocking.py
+from typing import Dict, Any, Iterable, Set
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Route, Request
+
+# Resource types (Playwright's request.resource_type) aborted by each profile.
+# "block_trackers" additionally aborts every request to BLOCKED_DOMAINS.
+RESOURCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "none": {"types": set(), "block_trackers": False},
+    # Crawling only needs the DOM and text. Stylesheets stay so innerText still respects visibility.
+    "crawler": {"types": {"image", "media", "font", "imageset"}, "block_trackers": True},
+    # Form pages are screenshotted for the user, so images and styles are kept.
+    "forms": {"types": {"media", "font"}, "block_trackers": True},
+    "dom_only": {"types": {"image", "media", "font", "imageset", "stylesheet"}, "block_trackers": True},
+}
+
+BLOCKED_DOMAINS = {
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "connect.facebook.net", "hotjar.com", "segment.io",
+    "segment.com", "mixpanel.com", "fullstory.com", "clarity.ms", "ads.linkedin.com", "px.ads.linkedin.com",
+    "bat.bing.com", "adservice.google.com", "amplitude.com", "heapanalytics.com", "quantserve.com",
+    "scorecardresearch.com", "taboola.com", "outbrain.com", "criteo.com",
+}
+
+# Hosts whose pages break without some blocked types; the listed types are always allowed there.
+SITE_EXCEPTIONS: Dict[str, Set[str]] = {
+    "typeform.com": {"font", "image"},
+    "docs.google.com": {"image"},
+    "jotform.com": {"image"},
+    "airtable.com": {"font"},
+}
+
+# Rough average size per aborted request, used to estimate bandwidth saved.
+ESTIMATED_BYTES = {
+    "image": 60_000, "imageset": 60_000, "media": 500_000, "font": 40_000,
+    "stylesheet": 30_000, "script": 50_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+def host_matches(host: str, domains: Iterable[str]) -> bool:
+    """True if host equals or is a subdomain of one of the domains."""
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourceBlocker:
+    """
+    Aborts heavy or tracking requests for a browser context according to a profile
+    and keeps per-session counters of what was blocked and what was loaded.
+    """
+
+    def __init__(self, profile: str = "crawler", extra_blocked_domains: Iterable[str] = (),
+                 site_exceptions: Dict[str, Set[str]] = None):
+        settings = RESOURCE_PROFILES.get(profile, RESOURCE_PROFILES["none"])
+        self.profile = profile
+        self.blocked_types: Set[str] = set(settings["types"])
+        self.blocked_domains: Set[str] = (BLOCKED_DOMAINS if settings["block_trackers"] else set()) | set(extra_blocked_domains)
+        self.site_exceptions = SITE_EXCEPTIONS if site_exceptions is None else site_exceptions
+        self.blocked_requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.estimated_blocked_bytes = 0
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+
+    async def install(self, context: BrowserContext):
+        """Routes every request of the context through the blocker."""
+        if self.blocked_types or self.blocked_domains:
+            await context.route("**/*", self._handle_route)
+        context.on("requestfinished", self._on_request_finished)
+
+    def should_block(self, resource_type: str, url: str, page_url: str = "") -> bool:
+        if resource_type == "document":
+            return False
+        host = urlparse(url).netloc.lower()
+        if host_matches(host, self.blocked_domains):
+            return True
+        if resource_type not in self.blocked_types:
+            return False
+        page_host = urlparse(page_url).netloc.lower()
+        for site, allowed_types in self.site_exceptions.items():
+            if resource_type in allowed_types and (host_matches(host, [site]) or host_matches(page_host, [site])):
+                return False
+        return True
+
+    async def _handle_route(self, route: Route):
+        request = route.request
+        try:
+            page_url = request.frame.url
+        except Exception:
+            page_url = ""
+        if self.should_block(request.resource_type, request.url, page_url):
+            self.blocked_requests += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            self.estimated_blocked_bytes += ESTIMATED_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    async def _on_request_finished(self, request: Request):
+        """
+        Counts a loaded response by the body bytes actually received, so chunked and compressed
+        responses without a content-length header are counted too. Falls back to that header.
+        """
+        self.loaded_requests += 1
+        try:
+            sizes = await request.sizes()
+            self.loaded_bytes += max(0, int(sizes.get("responseBodySize", 0)))
+            return
+        except Exception:
+            pass
+        try:
+            response = await request.response()
+            self.loaded_bytes += int(response.headers.get("content-length", 0)) if response else 0
+        except Exception:
+            pass
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "profile": self.profile,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_blocked_bytes": self.estimated_blocked_bytes,
+            "loaded_requests": self.loaded_requests,
+            "loaded_bytes": self.loaded_bytes,
+        }
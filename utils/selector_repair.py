@@ -0,0 +1,188 @@
+# utils/selector_repair.py
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Any, List
+
+from playwright.async_api import Page
+
+from utils.form_filling import resolve_selectors
+
+# Lists the page's form controls with what the accessibility tree would call them: the accessible name
+# (aria-labelledby, aria-label, associated <label>s, placeholder, title), role, name, id and type, plus a
+# selector that uniquely matches the control. Controls matched by one of the `taken` selectors are flagged.
+CONTROLS_SCRIPT = """(taken) => {
+    const text = (node) => (node ? (node.innerText || node.textContent || '') : '').replace(/\\s+/g, ' ').trim();
+    const cssEscape = (value) => (window.CSS && CSS.escape) ? CSS.escape(value) : value.replace(/["\\\\]/g, '\\\\$&');
+    const unique = (selector) => { try { return document.querySelectorAll(selector).length === 1; } catch (e) { return false; } };
+    const pathSelector = (el) => {
+        const parts = [];
+        while (el && el.nodeType === 1 && el !== document.body) {
+            let index = 1, sibling = el;
+            while ((sibling = sibling.previousElementSibling)) { if (sibling.tagName === el.tagName) index++; }
+            parts.unshift(`${el.tagName.toLowerCase()}:nth-of-type(${index})`);
+            el = el.parentElement;
+        }
+        return 'body > ' + parts.join(' > ');
+    };
+    const selectorFor = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (el.id && unique(`[id="${cssEscape(el.id)}"]`)) return `[id="${cssEscape(el.id)}"]`;
+        const name = el.getAttribute('name');
+        if (name) {
+            const byName = `${tag}[name="${cssEscape(name)}"]`;
+            if (unique(byName)) return byName;
+            if (el.value && unique(`${byName}[value="${cssEscape(el.value)}"]`)) return `${byName}[value="${cssEscape(el.value)}"]`;
+        }
+        return pathSelector(el);
+    };
+    const labelText = (el) => {
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const joined = labelledBy.split(/\\s+/).map(id => text(document.getElementById(id))).join(' ').trim();
+            if (joined) return joined;
+        }
+        if (el.getAttribute('aria-label')) return el.getAttribute('aria-label').trim();
+        if (el.labels && el.labels.length) return Array.from(el.labels).map(text).join(' ').trim();
+        const wrapper = el.closest('label');
+        if (wrapper) return text(wrapper);
+        return '';
+    };
+    const isTaken = (el) => taken.some(selector => { try { return el.matches(selector); } catch (e) { return false; } });
+    const controls = document.querySelectorAll(
+        'input, textarea, select, [contenteditable="true"], [role="textbox"], [role="combobox"], [role="checkbox"], [role="radio"]'
+    );
+    return Array.from(controls).filter(el => {
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        return !['submit', 'button', 'reset', 'image'].includes(type) && !el.disabled;
+    }).map(el => {
+        const tag = el.tagName.toLowerCase();
+        return {
+            selector: selectorFor(el),
+            tag,
+            type: tag === 'input' ? (el.getAttribute('type') || 'text').toLowerCase() : (tag === 'select' ? 'select' : tag),
+            role: el.getAttribute('role') || '',
+            name: el.getAttribute('name') || '',
+            id: el.id || '',
+            label: labelText(el),
+            placeholder: el.getAttribute('placeholder') || '',
+            title: el.getAttribute('title') || '',
+            taken: isTaken(el),
+        };
+    });
+}"""
+
+# Field types that can be filled by the same kind of control.
+TYPE_FAMILIES = [
+    {"text", "email", "tel", "url", "search", "password", "number", "textarea", "textbox"},
+    {"date", "datetime-local", "time", "month", "week"},
+    {"select", "combobox"},
+    {"checkbox"},
+    {"radio"},
+    {"file"},
+    {"hidden"},
+    {"range"},
+    {"color"},
+]
+
+# Tag, attribute and pseudo-class names that say nothing about which field a selector meant.
+SELECTOR_NOISE = {"input", "textarea", "select", "form", "div", "name", "id", "type", "class", "nth-of-type", "nth-child"}
+
+
+def normalize(value: str) -> str:
+    """Lower-cases and turns separators (camelCase, _, -, [], punctuation) into single spaces."""
+    value = re.sub(r"([a-z])([A-Z])", r"\1 \2", value or "")
+    value = re.sub(r"[^0-9a-zA-Z]+", " ", value)
+    return value.strip().lower()
+
+
+def similarity(a: str, b: str) -> float:
+    a, b = normalize(a), normalize(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    ratio = SequenceMatcher(None, a, b).ratio()
+    # One side containing the other as whole words ("email" in "work email address") is a strong hint.
+    if re.search(rf"\b{re.escape(a)}\b", b) or re.search(rf"\b{re.escape(b)}\b", a):
+        ratio = max(ratio, 0.85)
+    return ratio
+
+
+def type_compatible(field_type: str, control: Dict[str, Any]) -> bool:
+    field_type = (field_type or "text").lower()
+    control_type = control["role"] if control["role"] in ("textbox", "combobox", "checkbox", "radio") else control["type"]
+    for family in TYPE_FAMILIES:
+        if field_type in family:
+            return control_type in family
+    # Unknown field types are matched on text alone.
+    return True
+
+
+def score_control(field: Dict[str, Any], control: Dict[str, Any]) -> float:
+    """Similarity of a mapped field (label, name, selector) to a page control, 0 when the types cannot match."""
+    if not type_compatible(field.get("type"), control):
+        return 0.0
+    label = field.get("label") or ""
+    name = field.get("name") or ""
+    # Ids and names in the failed selector ("#first_name", "input[name='email']") are often nearly right.
+    selector_words = " ".join(
+        word for word in re.findall(r"[A-Za-z][\w-]*", field.get("selector") or "") if word.lower() not in SELECTOR_NOISE
+    )
+    accessible_name = control["label"] or control["placeholder"] or control["title"]
+    return max(
+        similarity(label, accessible_name),
+        similarity(label, control["placeholder"]),
+        similarity(name, control["name"]),
+        similarity(name, control["id"]),
+        0.9 * similarity(selector_words, control["name"] or control["id"]),
+        0.8 * similarity(name, accessible_name),
+    )
+
+
+async def list_controls(page: Page, taken: List[str] = None) -> List[Dict[str, Any]]:
+    try:
+        return await page.evaluate(CONTROLS_SCRIPT, taken or [])
+    except Exception:
+        return []
+
+
+async def repair_selectors(page: Page, fields: List[Dict[str, Any]], positions: List[int],
+                           taken: List[str] = None, min_score: float = 0.75,
+                           margin: float = 0.1) -> Dict[int, Dict[str, Any]]:
+    """
+    Finds replacement selectors for the fields at `positions` whose selectors match nothing.
+    Each field is compared to the page's controls by accessible name, label, placeholder, name and id
+    (fuzzy, via difflib) among controls of a compatible type. A control is used when it scores at least
+    `min_score`, beats the runner-up by `margin`, is not matched by a `taken` selector (those of the fields
+    that did resolve) and its selector resolves live on the page.
+    Returns {position: {"selector", "score", "matched"}}.
+    """
+    controls = [control for control in await list_controls(page, taken) if not control["taken"]]
+    used = set()
+    proposals: Dict[int, Dict[str, Any]] = {}
+    for position in positions:
+        field = fields[position]
+        ranked = sorted(
+            ((score_control(field, control), control) for control in controls if control["selector"] not in used),
+            key=lambda pair: pair[0], reverse=True
+        )
+        if not ranked:
+            continue
+        best_score, best = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if best_score < min_score or best_score - runner_up < margin:
+            continue
+        used.add(best["selector"])
+        proposals[position] = {
+            "selector": best["selector"],
+            "score": round(best_score, 2),
+            "matched": best["label"] or best["name"] or best["id"] or best["placeholder"],
+            "type": field.get("type"),
+        }
+
+    resolution = await resolve_selectors(page, list(proposals.values()), timeout=0)
+    return {
+        position: {key: proposal[key] for key in ("selector", "score", "matched")}
+        for position, proposal in proposals.items()
+        if resolution.get(proposal["selector"], {}).get("live")
+    }
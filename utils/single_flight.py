@@ -0,0 +1,63 @@
+# utils/single_flight.py
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlightCancelled(Exception):
+    """Raised in a waiter that gave up on a shared in-flight call."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the function,
+    later callers block until it finishes and receive the same result (or exception).
+    Each waiter may pass its own cancel event to stop waiting without affecting the others.
+    Works across sessions because agents run in (eventlet-patched) threads of one process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           cancel_event: threading.Event = None, poll_interval: float = 0.05) -> Tuple[Any, bool]:
+        """Returns (result, shared) where shared is True if the result came from another caller's request."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+            return call.result, False
+
+        while not call.done.wait(poll_interval if cancel_event is not None else None):
+            if cancel_event.is_set():
+                raise SingleFlightCancelled(f"Stopped waiting for in-flight call {key}")
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,45 @@
+# utils/url_tools.py
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# Query parameters that only carry tracking/attribution and never change page content.
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "_ga", "_gl", "ref", "ref_src", "source", "trk", "hsctatracking",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_")
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns a canonical form of a URL for de-duplication:
+    lower-case scheme and host, http treated as https, default port, trailing dot and
+    trailing slash removed, fragment dropped, tracking parameters removed and the rest sorted.
+    Non-http(s) URLs (mailto:, tel:, javascript:) and malformed ones (bad port, unclosed IPv6 bracket)
+    are returned stripped but otherwise unchanged.
+    """
+    try:
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        if scheme not in ("http", "https"):
+            return url.strip()
+        host = (parsed.hostname or "").rstrip(".")
+        port = parsed.port
+    except ValueError:
+        return url.strip()
+    netloc = host if port is None or str(port) == DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not is_tracking_param(key)
+    ))
+    return urlunparse(("https", netloc, path, "", query, ""))
+